@@ -0,0 +1,33 @@
+import glob
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("reportlab")
+pytest.importorskip("matplotlib")
+pypdf = pytest.importorskip("pypdf")
+
+from PIL import Image
+
+from utils.batch_report import ROW_H, ROWS_BOTTOM, ROWS_TOP, BatchReportBuilder, make_thumbnail
+
+
+def test_thousand_images_within_time_budget(tmp_path):
+    rng = np.random.default_rng(0)
+    thumbnails = [make_thumbnail(Image.fromarray(rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)))
+                  for _ in range(20)]
+    output = tmp_path / "report.pdf"
+    budget = 5.0
+
+    started = time.perf_counter()
+    with BatchReportBuilder(str(output), model_name="ResNet50", time_budget_s=budget) as report:
+        for i in range(1000):
+            report.add(f"img{i:04d}.jpg", f"class {i % 40}", 0.3 + (i % 7) / 10, thumbnail=thumbnails[i % 20])
+    elapsed = time.perf_counter() - started
+
+    # Rows past the budget go without thumbnails, so only the cheap drawing and the merge remain.
+    assert elapsed < 2 * budget + 10
+    rows_per_page = int((ROWS_TOP - ROWS_BOTTOM) / ROW_H)
+    assert len(pypdf.PdfReader(str(output)).pages) == -(-1000 // rows_per_page) + 1
+    assert not glob.glob(str(tmp_path / "*.part*.pdf"))
@@ -0,0 +1,72 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("reportlab")
+pytest.importorskip("streamlit")
+
+from PIL import Image
+
+from tools import bulk_classify
+from utils.class_names import CAR_CLASSES
+
+
+class _FixedModel:
+    """Always predicts the first class; stands in for a Keras model."""
+
+    def predict_on_batch(self, batch):
+        probs = np.zeros((len(batch), len(CAR_CLASSES)), dtype=np.float32)
+        probs[:, 0] = 1.0
+        return probs
+
+
+def test_main_in_process(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    images.mkdir()
+    for name in ("a.jpg", "b.jpg"):
+        Image.new("RGB", (64, 48), "red").save(images / name)
+    output = tmp_path / "results.csv"
+    monkeypatch.setattr(bulk_classify, "load_custom_model", lambda path: _FixedModel())
+
+    bulk_classify.main([str(images), "--model", "ResNet50", "--processes", "0", "--output", str(output),
+                        "--workers", "2"])
+
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(row["path"] for row in rows) == ["a.jpg", "b.jpg"]
+    assert all(row["top1_class"] == CAR_CLASSES[0] for row in rows)
+    with open(str(output) + ".progress", encoding="utf-8") as f:
+        assert sorted(f.read().split()) == ["a.jpg", "b.jpg"]
+
+
+def test_resume_skips_done_images_and_reports_the_whole_batch(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    images.mkdir()
+    for name in ("a.jpg", "b.jpg"):
+        Image.new("RGB", (64, 48), "red").save(images / name)
+    output = tmp_path / "results.jsonl"
+    monkeypatch.setattr(bulk_classify, "load_custom_model", lambda path: _FixedModel())
+    reported = []
+
+    class _RecordingReport(bulk_classify.BatchReportBuilder):
+        def add(self, image_name, top_class, confidence, image=None, thumbnail=None):
+            reported.append((image_name, thumbnail is not None))
+            super().add(image_name, top_class, confidence, image, thumbnail)
+
+    monkeypatch.setattr(bulk_classify, "BatchReportBuilder", _RecordingReport)
+    args = [str(images), "--model", "ResNet50", "--output", str(output), "--workers", "2"]
+    bulk_classify.main(args)
+    # Stopped after writing a's row but before its progress entry, then c was added.
+    (tmp_path / "results.jsonl.progress").write_text("b.jpg\n", encoding="utf-8")
+    Image.new("RGB", (64, 48), "blue").save(images / "c.jpg")
+
+    bulk_classify.main(args + ["--report", str(tmp_path / "report.pdf")])
+
+    with open(output, encoding="utf-8") as f:
+        paths = [json.loads(line)["path"] for line in f]
+    assert sorted(paths) == ["a.jpg", "b.jpg", "c.jpg"]
+    assert sorted(reported) == [("a.jpg", False), ("b.jpg", False), ("c.jpg", True)]
+    assert (tmp_path / "report.pdf").exists()
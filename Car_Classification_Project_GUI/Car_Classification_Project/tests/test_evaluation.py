@@ -0,0 +1,31 @@
+import numpy as np
+
+from utils.evaluation import CLASS_NAMES, ConfusionAccumulator, label_for
+
+
+def test_label_for_uses_sorted_folder_order():
+    # list_splits / flow_from_directory number the classes by sorted folder name.
+    assert label_for("test/AM General Hummer SUV 2000/00076.jpg") == 0
+    assert label_for("test/Acura Integra Type R 2001/00001.jpg") == 1
+    assert CLASS_NAMES[1] == "Acura Integra Type R 2001"
+    ram = label_for("test/Ram C-V Cargo Van Minivan 2012/00010.jpg")
+    assert CLASS_NAMES[ram] == "Ram C/V Cargo Van Minivan 2012"
+    assert label_for("test/Not A Car/00001.jpg") is None
+    assert label_for("00001.jpg") is None
+
+
+def test_confusion_accumulator_summary():
+    acc = ConfusionAccumulator(n_classes=6)
+    probs = np.full((4, 6), 0.01, dtype=np.float32)
+    probs[[0, 1, 2, 3], [0, 0, 1, 2]] = 0.9
+    probs[1, 1] = 0.05  # the miss still has its label in the top 5
+    acc.update([0, 1, 1, 2], probs, seconds=0.4)
+    summary = acc.summary(class_names=["a", "b", "c", "d", "e", "f"])
+
+    assert summary["images"] == 4
+    assert summary["accuracy"] == 0.75
+    assert summary["top5_accuracy"] == 1.0
+    assert summary["ms_per_image"] == 100.0
+    assert summary["per_class_accuracy"] == {"a": 1.0, "b": 0.5, "c": 1.0}
+    assert summary["support"] == {"a": 1, "b": 2, "c": 1}
+    assert np.array_equal(np.asarray(summary["confusion_matrix"])[:3, :3], [[1, 0, 0], [1, 1, 0], [0, 0, 1]])
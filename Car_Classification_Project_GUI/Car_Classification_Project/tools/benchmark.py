@@ -0,0 +1,281 @@
+"""
+Offline benchmarks for the inference hot paths.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.benchmark                                   # stand-in models, all cases
+    python -m tools.benchmark --models ResNet50 --cases preprocess gradcam
+    python -m tools.benchmark --real-weights                    # the trained models in models/
+    python -m tools.benchmark --compare benchmark_results/abc1234.json
+
+Without --real-weights every model is rebuilt from the training notebooks'
+architecture (same backbone, head and input size) with random weights, so the
+suite needs no downloads and gives the same graph cost as the real files.
+Inputs come from a fixed seed.
+
+Cases per model: preprocess (smart_preprocess on a 1280x720 photo), predict_1
+and predict_batch (predict_on_batch), gradcam (make_gradcam_heatmap), overlay
+(overlay_heatmap) and live_frame (the Real-Time page's per-frame work without
+the browser). `pdf` builds an analysis report once for the whole run.
+
+For each case the p50/p90/p99 latency, throughput and peak RSS while it ran are
+printed and saved to benchmark_results/<git revision>.json. --compare prints
+the p50 change against an earlier result file and exits with 1 when a case got
+slower than --threshold.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from utils.class_names import CAR_CLASSES
+from utils.model_helper import MODEL_FILES, MODELS_DIR, load_custom_model, fold_head_batchnorm, get_input_size, \
+    smart_preprocess, get_last_conv_layer, make_gradcam_heatmap, overlay_heatmap
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_DIR, "benchmark_results")
+MODEL_CASES = ("preprocess", "predict_1", "predict_batch", "gradcam", "overlay", "live_frame")
+CASES = MODEL_CASES + ("pdf",)
+FRAME_SIZE = (1280, 720)
+
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        return None
+
+
+class _PeakRss:
+    """Samples the process RSS in the background while a case runs."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            current = rss_mb()
+            if current is not None:
+                self.peak = current if self.peak is None else max(self.peak, current)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def build_standin(model_name):
+    """The notebook architecture for `model_name` with random weights, folded like load_custom_model."""
+    import tensorflow as tf
+    from tensorflow.keras import applications
+    from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout, BatchNormalization
+
+    backbones = {
+        "EfficientNetB4": applications.EfficientNetB4,
+        "InceptionV3": applications.InceptionV3,
+        "ResNet50": applications.ResNet50,
+    }
+    width, height = get_input_size(model_name)
+    base = backbones[model_name](weights=None, include_top=False, input_shape=(height, width, 3))
+    x = GlobalAveragePooling2D()(base.output)
+    x = BatchNormalization()(x)
+    if model_name == "EfficientNetB4":
+        x = Dense(1024, activation="relu")(x)
+        x = BatchNormalization()(x)
+        x = Dropout(0.6)(x)
+    else:
+        x = Dropout(0.5)(x)
+    outputs = Dense(len(CAR_CLASSES), activation="softmax")(x)
+    return fold_head_batchnorm(tf.keras.Model(base.input, outputs, name=f"{model_name}_standin"))
+
+
+def load_model(model_name, real_weights):
+    if not real_weights:
+        return build_standin(model_name)
+    path = os.path.join(MODELS_DIR, MODEL_FILES[model_name])
+    if not os.path.exists(path):
+        sys.exit(f"{path} not found; drop --real-weights to use stand-in models")
+    return load_custom_model(path)
+
+
+def time_case(fn, runs, warmup, items=1):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    with _PeakRss() as rss:
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    ms = 1000 * np.asarray(timings)
+    return {
+        "runs": runs,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+        "throughput_per_s": items * runs / float(np.sum(timings)),
+        "peak_rss_mb": rss.peak,
+    }
+
+
+def model_cases(model_name, model, photo, frame_bgr, batch_size):
+    """Callables per case name, each returning the number of images it handles."""
+    import cv2
+
+    x1 = smart_preprocess(photo, model_name)
+    batch = np.repeat(x1, batch_size, axis=0)
+    last_conv = get_last_conv_layer(model)
+    heatmap = make_gradcam_heatmap(x1, model, last_conv)
+
+    def live_frame():
+        rgb_frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        processed_input = smart_preprocess(Image.fromarray(rgb_frame), model_name)
+        np.asarray(model(processed_input, training=False))
+        cv2.cvtColor(cv2.resize(frame_bgr, (640, 480)), cv2.COLOR_BGR2RGB)
+
+    return {
+        "preprocess": (lambda: smart_preprocess(photo, model_name), 1),
+        "predict_1": (lambda: model.predict_on_batch(x1), 1),
+        "predict_batch": (lambda: model.predict_on_batch(batch), batch_size),
+        "gradcam": (lambda: make_gradcam_heatmap(x1, model, last_conv), 1),
+        "overlay": (lambda: overlay_heatmap(heatmap, photo), 1),
+        "live_frame": (live_frame, 1),
+    }
+
+
+def pdf_case(photo):
+    from utils.reports import generate_analysis_report
+
+    probs = np.random.default_rng(0).dirichlet(np.ones(len(CAR_CLASSES)))[None, :]
+    top_3 = probs[0].argsort()[-3:][::-1]
+    result_data = {"model_name": "EfficientNetB4", "top_class": CAR_CLASSES[top_3[0]],
+                   "confidence": float(probs[0][top_3[0]]), "preds": probs, "top_3_indices": top_3}
+    buffer = io.BytesIO()
+    photo.save(buffer, format="JPEG", quality=90)
+    img_bytes = buffer.getvalue()
+    return lambda: generate_analysis_report(result_data, img_bytes, img_bytes)
+
+
+def environment():
+    try:
+        revision = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, text=True,
+                                           stderr=subprocess.DEVNULL).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--", "."], cwd=PROJECT_DIR,
+                                             text=True, stderr=subprocess.DEVNULL).strip())
+    except (OSError, subprocess.CalledProcessError):
+        revision, dirty = "unknown", False
+    import tensorflow as tf
+    return {"revision": revision, "dirty": dirty, "python": platform.python_version(),
+            "tensorflow": tf.__version__, "numpy": np.__version__, "platform": platform.platform(),
+            "cpu_count": os.cpu_count()}
+
+
+def run(args):
+    import tensorflow as tf
+    tf.keras.utils.set_random_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    photo = Image.fromarray(rng.integers(0, 256, (FRAME_SIZE[1], FRAME_SIZE[0], 3), dtype=np.uint8))
+    frame_bgr = np.asarray(photo)[:, :, ::-1].copy()
+
+    results = {}
+    for model_name in args.models:
+        wanted = [case for case in args.cases if case in MODEL_CASES]
+        if not wanted:
+            break
+        model = load_model(model_name, args.real_weights)
+        cases = model_cases(model_name, model, photo, frame_bgr, args.batch_size)
+        for case in wanted:
+            fn, items = cases[case]
+            runs = max(3, args.runs // items) if case == "predict_batch" else args.runs
+            results[f"{case}/{model_name}"] = time_case(fn, runs, args.warmup, items)
+            _print_result(f"{case}/{model_name}", results[f"{case}/{model_name}"])
+        del model, cases
+        tf.keras.backend.clear_session()
+
+    if "pdf" in args.cases:
+        results["pdf/analysis"] = time_case(pdf_case(photo), max(3, args.runs // 4), 1)
+        _print_result("pdf/analysis", results["pdf/analysis"])
+    return results
+
+
+def _print_result(name, r):
+    rss = f"{r['peak_rss_mb']:7.0f} MB" if r["peak_rss_mb"] is not None else "      -"
+    print(f"{name:<30} p50 {r['p50_ms']:8.1f} ms | p90 {r['p90_ms']:8.1f} | p99 {r['p99_ms']:8.1f} | "
+          f"{r['throughput_per_s']:8.1f}/s | peak RSS {rss}")
+
+
+def compare(baseline_path, current, threshold):
+    """Prints the p50 change per case; returns True when any case slowed down by more than `threshold`."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nAgainst {baseline['environment']['revision']} ({baseline_path}):")
+    regressed = False
+    for name, result in current.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<30} new")
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        slower = change > threshold
+        regressed |= slower
+        print(f"{name:<30} {before['p50_ms']:8.1f} -> {result['p50_ms']:8.1f} ms ({change:+.1%})"
+              f"{'  SLOWER' if slower else ''}")
+    return regressed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing, inference, Grad-CAM, overlay and PDFs.")
+    parser.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES))
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--real-weights", action="store_true", help="Use the trained files in models/")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result file (default: benchmark_results/<git revision>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare the p50 latencies with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    env = environment()
+    results = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{env['revision']}{'-dirty' if env['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": env, "settings": {k: v for k, v in vars(args).items() if k != "compare"},
+                   "results": results}, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare and compare(args.compare, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
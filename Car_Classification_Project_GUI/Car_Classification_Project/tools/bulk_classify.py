@@ -0,0 +1,389 @@
+"""
+Classifies every image in a folder or ZIP/TAR archive outside the Streamlit UI.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.bulk_classify path/to/images --model EfficientNetB4 --output results.csv
+
+`--model cascade` runs the ResNet50 -> InceptionV3 -> EfficientNetB4 cascade and
+prints its cost per image and accuracy; add `--compare-full` to also run
+EfficientNetB4 on every image for a measured baseline.
+
+`--processes N` runs a single model in N inference worker processes (see
+utils.worker_pool); with an ONNX export they share one copy of the weights.
+
+Finished images are appended to a progress file next to the output, so an
+interrupted run picks up where it stopped when started again with the same
+arguments. A resumed `--report` still covers the whole batch; images classified
+by the earlier runs are listed without thumbnails.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.batch_report import BatchReportBuilder, make_thumbnail
+from utils.class_names import CAR_CLASSES
+from utils.evaluation import label_for
+from utils.image_sources import iter_image_entries, decode_image, bounded_map
+from utils.model_helper import MODEL_FILES, MODELS_DIR, CASCADE_ORDER, CASCADE_MIN_CONFIDENCE, CASCADE_MIN_MARGIN, \
+    load_custom_model, preprocess_batch, resize_pyramid, cascade_predict_batch
+
+
+def _decode_job(key, read_bytes, model_names, thumb_size):
+    try:
+        image = decode_image(read_bytes())
+    except Exception as e:
+        return key, None, None, str(e)
+    pixels = resize_pyramid(image, model_names)
+    thumbnail = make_thumbnail(image, thumb_size) if thumb_size else None
+    return key, pixels, thumbnail, None
+
+
+def _result_row(key, model_name, probs, top_k):
+    row = {"path": key, "model": model_name}
+    for rank, idx in enumerate(np.argsort(probs)[::-1][:top_k], start=1):
+        row[f"top{rank}_class"] = CAR_CLASSES[idx]
+        row[f"top{rank}_prob"] = round(float(probs[idx]), 6)
+    return row
+
+
+class _CsvWriter:
+    def __init__(self, path, top_k):
+        fields = ["path", "model"]
+        for rank in range(1, top_k + 1):
+            fields += [f"top{rank}_class", f"top{rank}_prob"]
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fields)
+        if is_new:
+            self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlWriter:
+    def __init__(self, path, top_k):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Parquet files cannot be appended to, so a resumed run writes the next numbered part file."""
+
+    def __init__(self, path, top_k):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+        self._pa, self._pq = pa, pq
+        stem, ext = os.path.splitext(path)
+        part, self.path = 0, path
+        while os.path.exists(self.path):
+            part += 1
+            self.path = f"{stem}.part{part}{ext}"
+        self._writer = None
+
+    def write(self, rows):
+        if not rows:
+            return
+        table = self._pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _CascadeStats:
+    """Per-run cost and accuracy of the cascade versus always running EfficientNetB4."""
+
+    def __init__(self):
+        self.images = 0
+        self.answered = {name: 0 for name in CASCADE_ORDER}
+        self.stage_images = {name: 0 for name in CASCADE_ORDER}
+        self.stage_seconds = {name: 0.0 for name in CASCADE_ORDER}
+        self.full_seconds = 0.0
+        self.full_images = 0
+        self.agree = 0
+        self.labelled = 0
+        self.cascade_correct = 0
+        self.full_correct = 0
+
+    def update(self, keys, probs, answered_by, stage_times, full_probs=None):
+        self.images += len(keys)
+        for name, seconds in stage_times.items():
+            self.stage_seconds[name] += seconds
+        for name in answered_by:
+            self.answered[name] += 1
+            # An image answered at stage k also ran every stage before it.
+            for stage in CASCADE_ORDER[:CASCADE_ORDER.index(name) + 1]:
+                self.stage_images[stage] += 1
+
+        predicted = probs.argmax(axis=1)
+        full_predicted = full_probs.argmax(axis=1) if full_probs is not None else None
+        if full_predicted is not None:
+            self.full_images += len(keys)
+            self.agree += int((predicted == full_predicted).sum())
+        for i, key in enumerate(keys):
+            label = label_for(key)
+            if label is None:
+                continue
+            self.labelled += 1
+            self.cascade_correct += int(predicted[i] == label)
+            if full_predicted is not None:
+                self.full_correct += int(full_predicted[i] == label)
+
+    def print_summary(self):
+        shares = ", ".join(f"{name} {n / self.images:.1%}" for name, n in self.answered.items())
+        print(f"Cascade answered by: {shares}")
+
+        cascade_ms = 1000 * sum(self.stage_seconds.values()) / self.images
+        if self.full_images:
+            full_ms = 1000 * self.full_seconds / self.full_images
+            source = "measured"
+        elif self.stage_images["EfficientNetB4"]:
+            full_ms = 1000 * self.stage_seconds["EfficientNetB4"] / self.stage_images["EfficientNetB4"]
+            source = "estimated from escalated images"
+        else:
+            full_ms = None
+        line = f"Model time per image: cascade {cascade_ms:.1f} ms"
+        if full_ms:
+            line += f" vs EfficientNetB4 only {full_ms:.1f} ms ({source}, {cascade_ms / full_ms:.0%} of the cost)"
+        print(line)
+
+        if self.full_images:
+            print(f"Agreement with EfficientNetB4: {self.agree / self.full_images:.1%}")
+        if self.labelled:
+            line = f"Top-1 accuracy on {self.labelled} labelled images: cascade {self.cascade_correct / self.labelled:.1%}"
+            if self.full_images:
+                line += f", EfficientNetB4 {self.full_correct / self.labelled:.1%}"
+            print(line)
+
+
+WRITERS = {"csv": _CsvWriter, "jsonl": _JsonlWriter, "parquet": _ParquetWriter}
+
+
+def _load_progress(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def _read_written(path, fmt):
+    """
+    Rows already in the results. Rows are written before their progress entry,
+    so a run stopped between the two would otherwise write them again on resume;
+    a resumed --report also lists them again.
+    """
+    rows = []
+    if fmt == "parquet":
+        import glob
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return rows  # _ParquetWriter reports the missing dependency
+
+        stem, ext = os.path.splitext(path)
+        for part in [path] + sorted(glob.glob(f"{glob.escape(stem)}.part*{ext}")):
+            if os.path.exists(part):
+                try:
+                    rows += pq.read_table(part).to_pylist()
+                except Exception:
+                    pass  # a part cut off before its footer holds no readable rows
+        return rows
+    if not os.path.exists(path):
+        return rows
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            rows += (row for row in csv.DictReader(f) if row.get("path"))
+        else:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # partial last line
+                if "path" in row:
+                    rows.append(row)
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Classify a folder or ZIP/TAR archive of car images.")
+    parser.add_argument("input", help="Folder, .zip or .tar(.gz) archive of images")
+    parser.add_argument("--model", default="EfficientNetB4", choices=sorted(MODEL_FILES) + ["cascade"],
+                        help="A single architecture, or 'cascade' (ResNet50 -> InceptionV3 -> EfficientNetB4)")
+    parser.add_argument("--min-confidence", type=float, default=CASCADE_MIN_CONFIDENCE,
+                        help="Cascade: escalate when top-1 probability is below this")
+    parser.add_argument("--min-margin", type=float, default=CASCADE_MIN_MARGIN,
+                        help="Cascade: escalate when the top-1/top-2 margin is below this")
+    parser.add_argument("--compare-full", action="store_true",
+                        help="Cascade: also run EfficientNetB4 on every image to compare cost and accuracy")
+    parser.add_argument("--output", default="bulk_results.csv", help="Results file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="Defaults to the output file extension")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Decode threads")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Inference worker processes for a single model (0 = run in this process)")
+    parser.add_argument("--progress-file", help="Defaults to <output>.progress")
+    parser.add_argument("--report", help="Also write a batch PDF report to this path")
+    parser.add_argument("--report-budget", type=float, default=None,
+                        help="Seconds after which the PDF report stops embedding thumbnails")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        sys.exit(f"Unknown output format '{fmt}', use --format {{{','.join(sorted(WRITERS))}}}")
+
+    cascade = args.model == "cascade"
+    if cascade and args.processes:
+        sys.exit("--processes runs a single model; it cannot be combined with --model cascade")
+    model_names = list(CASCADE_ORDER) if cascade else [args.model]
+    if args.processes:
+        from utils.worker_pool import InferenceWorkerPool
+        try:
+            pool = InferenceWorkerPool(args.model, workers=args.processes, batch_size=args.batch_size)
+        except (RuntimeError, TimeoutError) as e:
+            sys.exit(str(e))
+        print(f"{args.processes} inference processes, weights {'shared' if pool.shared_weights else 'per process'}")
+        models = {args.model: pool}
+    else:
+        pool = None
+        models = {name: load_custom_model(os.path.join(MODELS_DIR, MODEL_FILES[name])) for name in model_names}
+    missing = [name for name, model in models.items() if model is None]
+    if missing:
+        sys.exit(f"Could not load {', '.join(missing)} from {MODELS_DIR}")
+    stats = _CascadeStats() if cascade else None
+
+    progress_path = args.progress_file or args.output + ".progress"
+    written = _read_written(args.output, fmt)
+    done = _load_progress(progress_path) | {row["path"] for row in written}
+    if done:
+        print(f"Resuming: {len(done)} images already processed")
+
+    writer = WRITERS[fmt](args.output, args.top_k)
+    report = BatchReportBuilder(args.report, model_name=args.model,
+                                time_budget_s=args.report_budget) if args.report else None
+    thumb_size = 160 if report else None
+    if report:
+        # The report is rewritten from scratch: earlier runs' rows first, without thumbnails.
+        for row in written:
+            report.add(row["path"], row["top1_class"], float(row["top1_prob"]))
+
+    processed = failed = 0
+    started = time.perf_counter()
+    # Batches submitted to the worker processes and not yet written, oldest first.
+    in_flight = deque()
+
+    def flush(batch):
+        if pool is None:
+            write(batch, *predict(batch))
+            return
+        pixels = preprocess_batch([item[1][args.model] for item in batch], args.model)
+        in_flight.append((batch, pool.submit(pixels)))
+        while len(in_flight) > args.processes:
+            drain_one()
+
+    def drain_one():
+        batch, ticket = in_flight.popleft()
+        write(batch, pool.result(ticket), [args.model] * len(batch))
+
+    def predict(batch):
+        keys = [item[0] for item in batch]
+        if cascade:
+            pixels = {name: [item[1][name] for item in batch] for name in model_names}
+            probs, answered_by, stage_times = cascade_predict_batch(pixels, models, args.min_confidence,
+                                                                    args.min_margin)
+            full_probs = None
+            if args.compare_full:
+                full_batch = preprocess_batch(pixels["EfficientNetB4"], "EfficientNetB4")
+                # Model time only, as cascade_predict_batch times its stages.
+                start = time.perf_counter()
+                full_probs = np.asarray(models["EfficientNetB4"].predict_on_batch(full_batch))
+                stats.full_seconds += time.perf_counter() - start
+            stats.update(keys, probs, answered_by, stage_times, full_probs)
+        else:
+            probs = np.asarray(models[args.model].predict_on_batch(
+                preprocess_batch([item[1][args.model] for item in batch], args.model)))
+            answered_by = [args.model] * len(batch)
+        return probs, answered_by
+
+    def write(batch, probs, answered_by):
+        nonlocal processed
+        keys = [item[0] for item in batch]
+        rows = [_result_row(key, name, p, args.top_k) for key, name, p in zip(keys, answered_by, probs)]
+        writer.write(rows)
+        if report:
+            for (key, _, thumbnail), row in zip(batch, rows):
+                report.add(key, row["top1_class"], row["top1_prob"], thumbnail=thumbnail)
+        progress.write("".join(k + "\n" for k in keys))
+        progress.flush()
+        processed += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"\r{processed} images | {processed / elapsed:.1f} img/s", end="", flush=True)
+
+    entries = ((key, read, model_names, thumb_size)
+               for key, read in iter_image_entries(args.input) if key not in done)
+    batch = []
+    try:
+        with open(progress_path, "a", encoding="utf-8") as progress, \
+                ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="decode") as decode_pool:
+            for key, pixels, thumbnail, error in bounded_map(decode_pool, _decode_job, entries,
+                                                             args.batch_size * 4):
+                if error is not None:
+                    failed += 1
+                    print(f"\nSkipping {key}: {error}", file=sys.stderr)
+                    progress.write(key + "\n")
+                    continue
+                batch.append((key, pixels, thumbnail))
+                if len(batch) == args.batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+            while in_flight:
+                drain_one()
+    except KeyboardInterrupt:
+        print("\nInterrupted, progress saved. Run the same command again to resume.")
+    finally:
+        if pool is not None:
+            pool.close()
+        writer.close()
+        if report:
+            report.close()
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"\nDone: {processed} classified, {failed} unreadable, {elapsed:.1f}s ({rate:.1f} img/s)")
+    if stats and stats.images:
+        stats.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Distils the trained .keras teachers into a small student for the live feed.
+
+Run from the Car_Classification_Project folder, pointing at the Stanford Cars
+folder layout the training notebooks use (train/ and test/ with one folder per class):
+
+    python -m tools.distill cache --data-dir path/to/car_data/car_data --teachers EfficientNetB4
+    python -m tools.distill train --data-dir path/to/car_data/car_data --arch MobileNetV3Large
+    python -m tools.distill benchmark
+
+`cache` runs each teacher once over every split and stores its log-probabilities,
+so training never loads a teacher. `train` fits the student against the cached
+soft targets plus the hard labels, evaluates it on the test split, measures CPU
+latency next to the teachers and writes models/student_model.keras with a
+student_model.json the Real-Time page reads to offer it as a fourth model.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout, BatchNormalization, Activation
+from tensorflow.keras.models import Model
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import ModelCheckpoint, ReduceLROnPlateau, EarlyStopping
+
+from utils.image_sources import bounded_map
+from utils.model_helper import MODEL_FILES, MODELS_DIR, STUDENT_MODEL_FILE, STUDENT_INFO_FILE, \
+    load_custom_model, preprocess_batch, get_input_size
+from utils.training_data import SPLITS, DEFAULT_AUGMENTATION, list_splits, build_dataset
+
+STUDENT_ARCHS = ("MobileNetV3Large", "MobileNetV3Small", "EfficientNetB0")
+
+
+def _load_pixels(path, target_size):
+    # Nearest-neighbour resize, as ImageDataGenerator did when the teachers were trained.
+    return np.asarray(tf.keras.utils.load_img(path, target_size=(target_size[1], target_size[0])), dtype=np.uint8)
+
+
+def _cache_path(cache_dir, teacher, split):
+    return os.path.join(cache_dir, f"{teacher}_{split}.npy")
+
+
+def cache_teacher_outputs(data_dir, cache_dir, teachers, batch_size=32, workers=8):
+    class_names, splits = list_splits(data_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, "splits.json"), "w", encoding="utf-8") as f:
+        json.dump({"class_names": class_names, "splits": splits}, f)
+
+    for teacher in teachers:
+        model = load_custom_model(os.path.join(MODELS_DIR, MODEL_FILES[teacher]))
+        if model is None:
+            sys.exit(f"Could not load {teacher} from {MODELS_DIR}")
+        target_size = get_input_size(teacher)
+
+        for split, entries in splits.items():
+            out_path = _cache_path(cache_dir, teacher, split)
+            if os.path.exists(out_path):
+                print(f"{teacher}/{split}: cached")
+                continue
+            log_probs = np.empty((len(entries), len(class_names)), dtype=np.float16)
+            started = time.perf_counter()
+            jobs = ((os.path.join(data_dir, rel_path), target_size) for rel_path, _ in entries)
+            batch, done = [], 0
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as pool:
+                for pixels in bounded_map(pool, _load_pixels, jobs, batch_size * 4):
+                    batch.append(pixels)
+                    if len(batch) == batch_size or done + len(batch) == len(entries):
+                        probs = np.asarray(model.predict_on_batch(preprocess_batch(batch, teacher)))
+                        log_probs[done:done + len(batch)] = np.log(np.clip(probs, 1e-8, 1.0))
+                        done += len(batch)
+                        batch = []
+                        print(f"\r{teacher}/{split}: {done}/{len(entries)}", end="", flush=True)
+            np.save(out_path, log_probs)
+            print(f"\r{teacher}/{split}: {len(entries)} images in {time.perf_counter() - started:.0f}s")
+
+
+def soft_targets(cache_dir, teachers, split, temperature):
+    """Averages the teachers' temperature-softened distributions from the cached log-probabilities."""
+    targets = None
+    for teacher in teachers:
+        path = _cache_path(cache_dir, teacher, split)
+        if not os.path.exists(path):
+            sys.exit(f"Missing {path}; run `python -m tools.distill cache` for {teacher} first")
+        scaled = np.load(path).astype(np.float32) / temperature
+        scaled -= scaled.max(axis=1, keepdims=True)
+        probs = np.exp(scaled)
+        probs /= probs.sum(axis=1, keepdims=True)
+        targets = probs if targets is None else targets + probs
+    return targets / len(teachers)
+
+
+def make_dataset(data_dir, entries, targets, num_classes, input_size, batch_size, training):
+    """
+    Yields `(image, [one_hot | soft_target])` batches. The label and the teacher
+    target travel together so a plain compile/fit loop can compute the combined loss.
+    """
+    paths = [os.path.join(data_dir, rel_path) for rel_path, _ in entries]
+    labels = tf.one_hot([label for _, label in entries], num_classes)
+    y = tf.concat([labels, tf.constant(targets, dtype=tf.float32)], axis=1)
+    # The students normalise inside their graph, so the pixels stay 0-255.
+    return build_dataset(paths, y, input_size, batch_size, training,
+                         augmentation=DEFAULT_AUGMENTATION if training else None, resize_method="bilinear")
+
+
+def distillation_loss(num_classes, temperature, alpha, label_smoothing=0.1):
+    """(1 - alpha) * smoothed cross-entropy on labels + alpha * T^2 * KL(teacher || student at T)."""
+    def loss(y_true, logits):
+        hard, soft = y_true[:, :num_classes], y_true[:, num_classes:]
+        ce = tf.keras.losses.categorical_crossentropy(hard, logits, from_logits=True,
+                                                      label_smoothing=label_smoothing)
+        kd = tf.keras.losses.kl_divergence(soft, tf.nn.softmax(logits / temperature))
+        return (1.0 - alpha) * ce + alpha * temperature ** 2 * kd
+
+    return loss
+
+
+def hard_label_accuracy(num_classes):
+    def accuracy(y_true, logits):
+        return tf.keras.metrics.categorical_accuracy(y_true[:, :num_classes], logits)
+
+    return accuracy
+
+
+def build_student(arch, num_classes, input_size):
+    """The notebooks' classification head on an ImageNet backbone; returns (logits_model, base_model)."""
+    base_model = getattr(tf.keras.applications, arch)(
+        weights="imagenet",
+        include_top=False,
+        input_shape=(input_size[1], input_size[0], 3)
+    )
+    base_model.trainable = False
+
+    x = base_model.output
+    x = GlobalAveragePooling2D()(x)
+    x = BatchNormalization()(x)
+    x = Dense(1024, activation="relu")(x)
+    x = BatchNormalization()(x)
+    x = Dropout(0.6)(x)
+    logits = Dense(num_classes, name="logits")(x)
+    return Model(base_model.input, logits), base_model
+
+
+def measure_latency(model, model_name, runs=30, warmup=5):
+    """Median single-image CPU latency in milliseconds, preprocessing included."""
+    width, height = get_input_size(model_name)
+    frame = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+    timings = []
+    with tf.device("/CPU:0"):
+        for i in range(warmup + runs):
+            start = time.perf_counter()
+            model.predict_on_batch(preprocess_batch([frame], model_name))
+            if i >= warmup:
+                timings.append(time.perf_counter() - start)
+    return 1000 * float(np.median(timings))
+
+
+def benchmark(student, arch, teachers, runs=30):
+    latency = {"student": measure_latency(student, arch, runs)}
+    for teacher in teachers:
+        model = load_custom_model(os.path.join(MODELS_DIR, MODEL_FILES[teacher]))
+        if model is not None:
+            latency[teacher] = measure_latency(model, teacher, runs)
+    return latency
+
+
+def train_student(args):
+    with open(os.path.join(args.cache_dir, "splits.json"), encoding="utf-8") as f:
+        cached = json.load(f)
+    class_names, splits = cached["class_names"], cached["splits"]
+    num_classes = len(class_names)
+    input_size = get_input_size(args.arch)
+
+    targets = {split: soft_targets(args.cache_dir, args.teachers, split, args.temperature) for split in SPLITS}
+    train_data = make_dataset(args.data_dir, splits["train"], targets["train"], num_classes, input_size,
+                              args.batch_size, training=True)
+    val_data = make_dataset(args.data_dir, splits["val"], targets["val"], num_classes, input_size,
+                            args.batch_size, training=False)
+
+    model, base_model = build_student(args.arch, num_classes, input_size)
+    os.makedirs(args.output_dir, exist_ok=True)
+    weights_path = os.path.join(args.output_dir, "student_best.weights.h5")
+    callbacks = [
+        ModelCheckpoint(weights_path, monitor="val_accuracy", save_best_only=True, save_weights_only=True, verbose=1),
+        ReduceLROnPlateau(monitor="val_loss", factor=0.3, patience=3, min_lr=1e-6, verbose=1),
+    ]
+    early_stop = EarlyStopping(monitor="val_loss", patience=6, restore_best_weights=True, verbose=1)
+    loss = distillation_loss(num_classes, args.temperature, args.alpha)
+    metrics = [hard_label_accuracy(num_classes)]
+
+    # Same three stages as the teacher notebooks: head only, top of the backbone, everything.
+    stages = [(args.epochs[0], 1e-3, 0, []), (args.epochs[1], 1e-4, 50, [early_stop]),
+              (args.epochs[2], 1e-5, None, [early_stop])]
+    for epochs, lr, unfreeze, extra in stages:
+        if not epochs:
+            continue
+        if unfreeze is None:
+            base_model.trainable = True
+        elif unfreeze:
+            for layer in base_model.layers[-unfreeze:]:
+                layer.trainable = True
+        model.compile(optimizer=Adam(lr), loss=loss, metrics=metrics)
+        model.fit(train_data, validation_data=val_data, epochs=epochs, callbacks=callbacks + extra)
+
+    model.load_weights(weights_path)
+    student = Model(model.input, Activation("softmax", dtype="float32", name="probs")(model.output))
+
+    test_labels = np.array([label for _, label in splits["test"]])
+    test_data = make_dataset(args.data_dir, splits["test"], targets["test"], num_classes, input_size,
+                             args.batch_size, training=False)
+    student_top1 = float(np.mean(np.argmax(student.predict(test_data), axis=1) == test_labels))
+    teacher_top1 = float(np.mean(np.argmax(targets["test"], axis=1) == test_labels))
+    print(f"Test top-1: student {student_top1:.2%}, teachers {teacher_top1:.2%}")
+
+    student_path = os.path.join(args.output_dir, STUDENT_MODEL_FILE)
+    student.save(student_path)
+    info = {
+        "arch": args.arch,
+        "input_size": list(input_size),
+        "teachers": list(args.teachers),
+        "temperature": args.temperature,
+        "alpha": args.alpha,
+        "top1": {"student": student_top1, "teachers": teacher_top1},
+        "accuracy_gap": student_top1 - teacher_top1,
+        "latency_ms": benchmark(student, args.arch, args.teachers),
+        "latency_device": "CPU",
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    _write_info(args.output_dir, info)
+
+
+def _write_info(output_dir, info):
+    with open(os.path.join(output_dir, STUDENT_INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    print("CPU latency (ms): " + ", ".join(f"{name} {ms:.1f}" for name, ms in info["latency_ms"].items()))
+    print(f"Accuracy gap to teachers: {100 * info['accuracy_gap']:+.1f} pts")
+
+
+def rebenchmark(args):
+    """Re-measures latency on this machine, e.g. the one serving the app, and updates the metrics file."""
+    with open(os.path.join(args.output_dir, STUDENT_INFO_FILE), encoding="utf-8") as f:
+        info = json.load(f)
+    student = load_custom_model(os.path.join(args.output_dir, STUDENT_MODEL_FILE))
+    if student is None:
+        sys.exit(f"Could not load {STUDENT_MODEL_FILE} from {args.output_dir}")
+    info["latency_ms"] = benchmark(student, info["arch"], info["teachers"], args.runs)
+    _write_info(args.output_dir, info)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Distil the trained teachers into a small student model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cache = sub.add_parser("cache", help="Run the teachers once and cache their outputs")
+    cache.add_argument("--data-dir", required=True, help="Folder with train/ and test/ class folders")
+    cache.add_argument("--teachers", nargs="+", default=["EfficientNetB4"], choices=sorted(MODEL_FILES))
+    cache.add_argument("--cache-dir", default="distill_cache")
+    cache.add_argument("--batch-size", type=int, default=32)
+    cache.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Decode threads")
+
+    train = sub.add_parser("train", help="Train, evaluate and benchmark the student")
+    train.add_argument("--data-dir", required=True)
+    train.add_argument("--teachers", nargs="+", default=["EfficientNetB4"], choices=sorted(MODEL_FILES))
+    train.add_argument("--cache-dir", default="distill_cache")
+    train.add_argument("--arch", default="MobileNetV3Large", choices=STUDENT_ARCHS)
+    train.add_argument("--temperature", type=float, default=4.0)
+    train.add_argument("--alpha", type=float, default=0.7, help="Weight of the distillation term")
+    train.add_argument("--epochs", type=int, nargs=3, default=[10, 20, 20], metavar=("HEAD", "TOP", "ALL"))
+    train.add_argument("--batch-size", type=int, default=16)
+    train.add_argument("--output-dir", default=MODELS_DIR)
+
+    bench = sub.add_parser("benchmark", help="Re-measure CPU latency of an existing student")
+    bench.add_argument("--output-dir", default=MODELS_DIR)
+    bench.add_argument("--runs", type=int, default=30)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "cache":
+        cache_teacher_outputs(args.data_dir, args.cache_dir, args.teachers, args.batch_size, args.workers)
+    elif args.command == "train":
+        train_student(args)
+    else:
+        rebenchmark(args)
+
+
+if __name__ == "__main__":
+    main()
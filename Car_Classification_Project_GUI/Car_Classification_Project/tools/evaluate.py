@@ -0,0 +1,318 @@
+"""
+Evaluates the three models on a labelled test set in one streaming pass.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.evaluate path/to/car_data/test
+    python -m tools.evaluate test.zip --models ResNet50 EfficientNetB4 --resize notebook
+
+The test set is laid out like Stanford Cars (one folder per class, as in the
+evaluation notebook), in a folder or a ZIP/TAR archive. Each image is decoded
+once by a pool of threads and resized for every model; batches then go through
+each model in turn. Only the running confusion matrices are kept, not the
+predictions, so memory stays flat however large the set is.
+
+The results (accuracy, top-5 accuracy, weighted precision/recall as in the
+notebook, per-class accuracy, confusion matrix and inference time per image)
+are written to models/evaluation.json, which the Model Comparison page shows.
+
+--resize app (default) resizes like the app does; --resize notebook uses the
+nearest-neighbour resize of Keras' flow_from_directory, to reproduce the
+notebook's numbers.
+
+Predictions are cached per model checkpoint and image in models/predictions
+(utils.prediction_store), so a rerun only decodes and infers images or
+checkpoints that are new or changed. --cached-only recomputes everything from
+that cache without reading a single image or loading a model:
+
+    python -m tools.evaluate --cached-only --top-classes 20 --worst 10
+
+--shards reads the test split from the pre-resized shards of
+`python -m tools.prepare_dataset` instead, with no JPEG decode or resize; it
+implies --resize notebook and uses the notebooks' test split (the second half
+of test/ per class):
+
+    python -m tools.evaluate --shards prepared
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+from utils.dataset_shards import ENCODINGS, iter_examples, read_meta, shard_dir
+from utils.evaluation import EVALUATION_FILE, CLASS_FOLDERS, CLASS_NAMES, ConfusionAccumulator, label_for, largest_classes, \
+    confusion_slice, worst_classes
+from utils.image_sources import iter_image_entries, decode_image, bounded_map
+from utils.model_helper import MODEL_FILES, MODELS_DIR, load_custom_model, get_input_size, resize_pyramid, \
+    preprocess_batch
+from utils.prediction_store import PredictionStore, image_digest
+
+
+def _decode_job(key, read_bytes, label, model_names, resize, stores):
+    """Hashes the image and decodes it only for the models without a cached prediction."""
+    try:
+        data = read_bytes()
+    except Exception as e:
+        return key, label, None, None, None, str(e)
+    digest = image_digest(data)
+    cached = {}
+    for name in model_names:
+        probs = stores[name].get(key, digest) if name in stores else None
+        if probs is not None:
+            cached[name] = probs
+    missing = [name for name in model_names if name not in cached]
+    if not missing:
+        return key, label, digest, {}, cached, None
+    try:
+        image = decode_image(data)
+    except Exception as e:
+        return key, label, digest, None, None, str(e)
+    if resize == "notebook":
+        pixels = {name: np.asarray(image.resize(get_input_size(name), Image.NEAREST)) for name in missing}
+    else:
+        pixels = resize_pyramid(image, missing)
+    return key, label, digest, pixels, cached, None
+
+
+def evaluate_cached(stores, accumulators, limit):
+    """Feeds every cached, labelled prediction to the accumulators; returns the number of images."""
+    images = 0
+    for name, store in stores.items():
+        keys, labels, rows = [], [], []
+        for key, _, probs in store.items():
+            label = label_for(key)
+            if label is not None:
+                keys.append(key)
+                labels.append(label)
+                rows.append(probs)
+            if limit and len(keys) == limit:
+                break
+        if rows:
+            accumulators[name].update(labels, np.stack(rows).astype(np.float32))
+        images = max(images, len(keys))
+    return images
+
+
+def evaluate_shards(args, stores, accumulators):
+    """Runs each model over its resolution's test shards; returns the number of images."""
+    processed = 0
+    for name in args.models:
+        directory = shard_dir(args.shards, "test", get_input_size(name), args.shard_encoding)
+        if read_meta(directory)["class_names"] != CLASS_FOLDERS:
+            sys.exit(f"The shard labels in {directory} do not follow the models' class order")
+        model = None
+        images = 0
+
+        def flush(batch):
+            nonlocal model
+            labels = [label for _, _, label, _ in batch]
+            cached = [stores[name].get(key, digest) if name in stores else None for key, digest, _, _ in batch]
+            hits = [i for i, probs in enumerate(cached) if probs is not None]
+            if hits:
+                accumulators[name].update([labels[i] for i in hits],
+                                          np.stack([cached[i] for i in hits]).astype(np.float32))
+            todo = [item for item, probs in zip(batch, cached) if probs is None]
+            if not todo:
+                return
+            if model is None:
+                model = load_custom_model(os.path.join(MODELS_DIR, MODEL_FILES[name]))
+                if model is None:
+                    sys.exit(f"Could not load {name}")
+            pixels = preprocess_batch([image for _, _, _, image in todo], name)
+            start = time.perf_counter()
+            probs = np.asarray(model.predict_on_batch(pixels))
+            seconds = time.perf_counter() - start
+            accumulators[name].update([label for _, _, label, _ in todo], probs, seconds)
+            if name in stores:
+                stores[name].add([key for key, _, _, _ in todo], [digest for _, digest, _, _ in todo], probs)
+                stores[name].record_time(len(todo), seconds)
+
+        batch = []
+        for key, digest, label, image in iter_examples(directory):
+            # Keys relative to test/, as a folder run over test/ stores them.
+            batch.append((key.split("/", 1)[1], digest, label, image))
+            images += 1
+            if len(batch) == args.batch_size:
+                flush(batch)
+                batch = []
+                print(f"\r{name}: {images} images", end="", flush=True)
+            if images == args.limit:
+                break
+        if batch:
+            flush(batch)
+        print(f"\r{name}: {images} images from {directory}")
+        processed = max(processed, images)
+    return processed
+
+
+def evaluate_images(args, stores, accumulators):
+    """Streams the test set; returns (images, unreadable, outside the known classes)."""
+    model_paths = {name: os.path.join(MODELS_DIR, MODEL_FILES[name]) for name in args.models}
+    models = {}
+    skipped, failed = [], 0
+
+    def get_model(name):
+        # Loaded on first use: a fully cached run never pays for it.
+        if name not in models:
+            models[name] = load_custom_model(model_paths[name])
+            if models[name] is None:
+                sys.exit(f"Could not load {name} from {model_paths[name]}")
+        return models[name]
+
+    def entries():
+        n = 0
+        for key, read in iter_image_entries(args.input):
+            label = label_for(key)
+            if label is None:
+                skipped.append(key)
+                continue
+            yield key, read, label, args.models, args.resize, stores
+            n += 1
+            if n == args.limit:
+                return
+
+    def flush(batch):
+        for name in args.models:
+            cached = [item for item in batch if name in item[4]]
+            if cached:
+                accumulators[name].update([item[1] for item in cached],
+                                          np.stack([item[4][name] for item in cached]).astype(np.float32))
+            todo = [item for item in batch if name in item[3]]
+            if not todo:
+                continue
+            pixels = preprocess_batch([item[3][name] for item in todo], name)
+            model = get_model(name)
+            start = time.perf_counter()
+            probs = np.asarray(model.predict_on_batch(pixels))
+            seconds = time.perf_counter() - start
+            accumulators[name].update([item[1] for item in todo], probs, seconds)
+            if name in stores:
+                stores[name].add([item[0] for item in todo], [item[2] for item in todo], probs)
+                stores[name].record_time(len(todo), seconds)
+
+    processed = 0
+    started = time.perf_counter()
+    batch = []
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="decode") as pool:
+        for key, label, digest, pixels, cached, error in bounded_map(pool, _decode_job, entries(),
+                                                                     args.batch_size * 4):
+            if error is not None:
+                failed += 1
+                print(f"\nSkipping {key}: {error}", file=sys.stderr)
+                continue
+            batch.append((key, label, digest, pixels, cached))
+            if len(batch) == args.batch_size:
+                flush(batch)
+                processed += len(batch)
+                batch = []
+                elapsed = time.perf_counter() - started
+                print(f"\r{processed} images | {processed / elapsed:.1f} img/s", end="", flush=True)
+        if batch:
+            flush(batch)
+            processed += len(batch)
+    print(f"\rInferred {', '.join(sorted(models)) or 'nothing'}; the rest came from the prediction cache")
+    return processed, failed, len(skipped)
+
+
+def print_details(results, top_classes, worst):
+    for name, r in results.items():
+        if top_classes:
+            cm = np.asarray(r["confusion_matrix"])
+            sliced = confusion_slice(cm, largest_classes(cm, top_classes))
+            print(f"{name:<15} accuracy on the {top_classes} largest classes: "
+                  f"{np.trace(sliced) / max(sliced.sum(), 1):.2%} ({int(sliced.sum())} images)")
+        if worst:
+            print(f"{name:<15} worst classes:")
+            for car, accuracy in worst_classes(r["per_class_accuracy"], worst):
+                print(f"    {accuracy:7.1%}  {car} ({r['support'][car]} images)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate the models on a labelled test set in one pass.")
+    parser.add_argument("input", nargs="?", help="Test folder or .zip/.tar archive with one sub-folder per class")
+    parser.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES))
+    parser.add_argument("--resize", choices=["app", "notebook"], default="app")
+    parser.add_argument("--shards", help="Root folder written by tools.prepare_dataset, instead of a test set")
+    parser.add_argument("--shard-encoding", choices=ENCODINGS, default="raw")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Decode threads")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after N images (0 = all)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the prediction cache")
+    parser.add_argument("--cached-only", action="store_true",
+                        help="Recompute the metrics from the prediction cache only")
+    parser.add_argument("--top-classes", type=int, default=0,
+                        help="Also print the accuracy on the confusion matrix of the N largest classes")
+    parser.add_argument("--worst", type=int, default=0, help="Also print the N least accurate classes")
+    parser.add_argument("--output", default=EVALUATION_FILE)
+    args = parser.parse_args(argv)
+    if args.cached_only and args.no_cache:
+        parser.error("--cached-only needs the cache")
+    if not args.cached_only and not args.input and not args.shards:
+        parser.error("the test set is required unless --cached-only or --shards is given")
+    if args.shards:
+        if args.input:
+            parser.error("give either a test set or --shards")
+        # The shards were resized like the notebooks' generators.
+        args.resize = "notebook"
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stores = {}
+    if not args.no_cache:
+        for name in args.models:
+            path = os.path.join(MODELS_DIR, MODEL_FILES[name])
+            if os.path.exists(path):
+                variant = None if args.resize == "app" else args.resize
+                if args.shards and args.shard_encoding == "jpeg":
+                    variant += "-jpeg"  # recompressed pixels can shift a prediction
+                stores[name] = PredictionStore(name, path, variant=variant)
+            elif args.cached_only:
+                sys.exit(f"{path} not found: the cache is keyed by the checkpoint's hash")
+    accumulators = {name: ConfusionAccumulator() for name in args.models}
+
+    started = time.perf_counter()
+    try:
+        if args.cached_only:
+            processed = evaluate_cached(stores, accumulators, args.limit)
+            failed = skipped = 0
+        elif args.shards:
+            processed = evaluate_shards(args, stores, accumulators)
+            failed = skipped = 0
+        else:
+            processed, failed, skipped = evaluate_images(args, stores, accumulators)
+    finally:
+        for store in stores.values():
+            store.close()
+    elapsed = time.perf_counter() - started
+    print(f"{processed} images in {elapsed:.2f}s ({failed} unreadable, {skipped} outside the known classes)")
+    if not processed:
+        sys.exit("No labelled images found")
+
+    results = {name: acc.summary(stores[name].ms_per_image if name in stores else None)
+               for name, acc in accumulators.items()}
+    for name, r in results.items():
+        speed = f"{r['ms_per_image']:.1f} ms/image" if r["ms_per_image"] is not None else "speed unknown"
+        print(f"{name:<15} accuracy {r['accuracy']:.2%} | top-5 {r['top5_accuracy']:.2%} | "
+              f"precision {r['precision']:.2%} | recall {r['recall']:.2%} | {speed}")
+    print_details(results, args.top_classes, args.worst)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                   "dataset": os.path.abspath(args.input or args.shards) if args.input or args.shards
+                   else "prediction cache",
+                   "resize": args.resize, "images": processed, "elapsed_s": elapsed, "class_names": CLASS_NAMES,
+                   "models": results}, f)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Exports the trained models to ONNX and checks them against Keras.
+
+Run from the Car_Classification_Project folder (needs `pip install tf2onnx onnxruntime`):
+
+    python -m tools.export_onnx
+    python -m tools.export_onnx --models ResNet50 --images path/to/sample_images --threads 4
+
+Each model is loaded with its head BatchNorm folded, converted with a dynamic
+batch dimension into models/onnx/, then run through both runtimes on the same
+inputs. The exit code is non-zero if any model's probabilities differ by more
+than --tolerance. Latencies per batch size for Keras and ONNX Runtime are
+printed and written to models/onnx/export_report.json.
+
+The app uses the exports when started with CARXPLAIN_BACKEND=onnx
+(CARXPLAIN_ORT_THREADS and CARXPLAIN_ORT_OPT_LEVEL tune the session).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from utils.image_sources import iter_image_entries, decode_image
+from utils.model_helper import MODEL_FILES, MODELS_DIR, ONNX_DIR, OnnxModel, onnx_path_for, \
+    fold_head_batchnorm, get_input_size, preprocess_batch
+
+
+def export_model(model, model_name, output_path, opset):
+    import tf2onnx
+
+    width, height = get_input_size(model_name)
+    signature = (tf.TensorSpec((None, height, width, 3), tf.float32, name="input"),)
+    # Tracing a plain tf.function works for both Keras 2 and Keras 3 models.
+    forward = tf.function(lambda x: model(x, training=False), input_signature=signature)
+    tf2onnx.convert.from_function(forward, input_signature=signature, opset=opset, output_path=output_path)
+
+
+def sample_inputs(model_name, images_dir, count):
+    """Preprocessed real images when a folder is given, otherwise random pixels."""
+    width, height = get_input_size(model_name)
+    pixels = []
+    if images_dir:
+        for _, read_bytes in iter_image_entries(images_dir):
+            pixels.append(np.asarray(decode_image(read_bytes()).resize((width, height))))
+            if len(pixels) == count:
+                break
+    rng = np.random.default_rng(0)
+    while len(pixels) < count:
+        pixels.append(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    return preprocess_batch(pixels, model_name)
+
+
+def median_latency_ms(predict, batch, runs, warmup=3):
+    for _ in range(warmup):
+        predict(batch)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predict(batch)
+        timings.append(time.perf_counter() - start)
+    return 1000 * float(np.median(timings))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export the models to ONNX and compare with Keras.")
+    parser.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES))
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--images", help="Folder or archive of images for the parity check (default: random)")
+    parser.add_argument("--parity-images", type=int, default=16)
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max allowed |probability difference|")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = all cores)")
+    parser.add_argument("--opt-level", default="all", choices=["disable", "basic", "extended", "all"])
+    parser.add_argument("--skip-export", action="store_true", help="Only re-run the checks on existing exports")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        import onnxruntime  # noqa: F401
+        if not args.skip_export:
+            import tf2onnx  # noqa: F401
+    except ImportError as e:
+        sys.exit(f"ONNX export needs tf2onnx and onnxruntime: pip install tf2onnx onnxruntime ({e})")
+    os.makedirs(ONNX_DIR, exist_ok=True)
+
+    report, failed = [], False
+    for name in args.models:
+        source = os.path.join(MODELS_DIR, MODEL_FILES[name])
+        if not os.path.exists(source):
+            print(f"{name}: {source} not found, skipped")
+            continue
+        keras_model = fold_head_batchnorm(tf.keras.models.load_model(source))
+        onnx_path = onnx_path_for(source)
+        if not args.skip_export:
+            started = time.perf_counter()
+            export_model(keras_model, name, onnx_path, args.opset)
+            print(f"{name}: exported to {onnx_path} in {time.perf_counter() - started:.1f}s")
+        onnx_model = OnnxModel(onnx_path, args.threads, args.opt_level)
+
+        inputs = sample_inputs(name, args.images, args.parity_images)
+        expected = np.asarray(keras_model.predict_on_batch(inputs))
+        actual = onnx_model.predict_on_batch(inputs)
+        max_diff = float(np.max(np.abs(expected - actual)))
+        top1_match = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+        passed = max_diff <= args.tolerance
+        failed |= not passed
+        print(f"{name}: parity {'OK' if passed else 'FAILED'} (max |diff| {max_diff:.2e}, "
+              f"top-1 agreement {top1_match:.0%})")
+
+        latency = {}
+        for batch_size in args.batch_sizes:
+            batch = np.resize(inputs, (batch_size,) + inputs.shape[1:])
+            keras_ms = median_latency_ms(keras_model.predict_on_batch, batch, args.runs)
+            onnx_ms = median_latency_ms(onnx_model.predict_on_batch, batch, args.runs)
+            latency[batch_size] = {"keras_ms": keras_ms, "onnx_ms": onnx_ms}
+            print(f"  batch {batch_size:>3}: Keras {keras_ms:8.1f} ms | ONNX Runtime {onnx_ms:8.1f} ms "
+                  f"({keras_ms / onnx_ms:.2f}x)")
+
+        report.append({"model": name, "onnx_path": onnx_path, "size_mb": os.path.getsize(onnx_path) / 1e6,
+                       "max_abs_diff": max_diff, "top1_agreement": top1_match, "parity_ok": passed,
+                       "threads": args.threads, "opt_level": args.opt_level, "latency": latency})
+
+    with open(os.path.join(ONNX_DIR, "export_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Saves copies of the models with the classification head's BatchNormalization
+folded into the Dense weights and Dropout removed.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.fold_batchnorm --output-dir models/folded
+
+The app already folds at load time; this is for shipping pre-folded files
+(or checking the folding) without loading through Streamlit.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from utils.model_helper import MODEL_FILES, MODELS_DIR, fold_head_batchnorm, get_input_size
+
+
+def _latency_ms(model, model_name, runs=50):
+    width, height = get_input_size(model_name)
+    batch = np.random.uniform(0, 255, (1, height, width, 3)).astype(np.float32)
+    model.predict_on_batch(batch)
+    started = time.perf_counter()
+    for _ in range(runs):
+        model.predict_on_batch(batch)
+    return 1000 * (time.perf_counter() - started) / runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold head BatchNorm layers into Dense weights.")
+    parser.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES))
+    parser.add_argument("--output-dir", default=os.path.join(MODELS_DIR, "folded"))
+    args = parser.parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for name in args.models:
+        source = os.path.join(MODELS_DIR, MODEL_FILES[name])
+        if not os.path.exists(source):
+            print(f"{name}: {source} not found, skipped")
+            continue
+        model = tf.keras.models.load_model(source)
+        folded = fold_head_batchnorm(model)
+        if folded is model:
+            print(f"{name}: nothing folded")
+            continue
+
+        width, height = get_input_size(name)
+        batch = np.random.uniform(0, 255, (4, height, width, 3)).astype(np.float32)
+        max_diff = float(np.max(np.abs(model.predict_on_batch(batch) - folded.predict_on_batch(batch))))
+        path = os.path.join(args.output_dir, MODEL_FILES[name])
+        folded.save(path)
+        print(f"{name}: {len(model.layers)} -> {len(folded.layers)} layers, max |diff| {max_diff:.2e}, "
+              f"{_latency_ms(model, name):.1f} -> {_latency_ms(folded, name):.1f} ms/image, saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Trains the classification head on cached backbone features, like stage 1 of the
+training notebooks (frozen ImageNet backbone, head only) without running the
+backbone every epoch.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.head_features extract --data-dir path/to/car_data/car_data --model EfficientNetB4 --copies 4
+    python -m tools.head_features train --model EfficientNetB4
+    python -m tools.head_features train --model EfficientNetB4 --lr 1e-3 3e-4 --units 512 1024 --dropout 0.4 0.6 --attach
+
+`extract` runs the frozen backbone once over every split and stores the pooled
+features (float16 .npy files, read back memory-mapped) in --cache-dir. Copy 0
+is the plain images; --copies N adds N-1 augmented passes over train, with the
+model's notebook augmentation. --shards reads the pre-resized shards of
+tools.prepare_dataset instead of the JPEGs.
+
+`train` fits the head (BatchNormalization -> Dense(units) -> BatchNormalization
+-> Dropout -> Dense(196)) on those features; every combination of --lr, --units
+and --dropout is a run of the sweep, picked on validation accuracy and reported
+on test. The defaults are the model's notebook head (no Dense layer for ResNet50
+and InceptionV3). The best head is written to <output-dir>/<model>_head.keras
+with its settings in <model>_head.json; --attach also saves
+<model>_stage1.keras, the ImageNet backbone with that head, ready for the
+notebooks' fine-tuning stages.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import Dense, Dropout, BatchNormalization, Input
+from tensorflow.keras.models import Model
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import EarlyStopping
+
+from utils.dataset_shards import ENCODINGS, read_meta, shard_dataset, shard_dir
+from utils.model_helper import MODEL_FILES, get_input_size
+from utils.training_data import SPLITS, AUGMENTATION, DEFAULT_AUGMENTATION, list_splits, build_dataset
+
+FEATURES_DTYPE = np.float16
+
+# Stage-1 heads of the notebooks: (Dense units, dropout), 0 units = no Dense layer.
+NOTEBOOK_HEADS = {
+    "EfficientNetB4": (1024, 0.6),
+    "InceptionV3": (0, 0.5),
+    "ResNet50": (0, 0.5),
+}
+
+
+def build_backbone(model_name):
+    """The model's ImageNet backbone with global average pooling, frozen as in stage 1."""
+    width, height = get_input_size(model_name)
+    base = getattr(tf.keras.applications, model_name)(weights="imagenet", include_top=False, pooling="avg",
+                                                      input_shape=(height, width, 3))
+    base.trainable = False
+    return base
+
+
+def build_head(feature_dim, num_classes, units=1024, dropout=0.6):
+    inputs = Input((feature_dim,), name="features")
+    x = BatchNormalization()(inputs)
+    if units:
+        x = Dense(units, activation="relu")(x)
+        x = BatchNormalization()(x)
+    x = Dropout(dropout)(x)
+    outputs = Dense(num_classes, activation="softmax", dtype="float32")(x)
+    return Model(inputs, outputs, name="head")
+
+
+def attach_head(model_name, head):
+    """The full stage-1 model: frozen backbone, pooled features, trained head."""
+    base = build_backbone(model_name)
+    return Model(base.input, head(base.output), name=f"{model_name}_stage1")
+
+
+def _features_path(cache_dir, model_name, split, copy):
+    return os.path.join(cache_dir, model_name, f"{split}_{copy}.npy")
+
+
+def _labels_path(cache_dir, model_name, split, copy):
+    return os.path.join(cache_dir, model_name, f"{split}_{copy}.labels.npy")
+
+
+def _image_batches(args, split, augmented, splits):
+    """`(preprocessed images, int labels)` batches of a split and its size, from JPEGs or shards."""
+    augmentation = AUGMENTATION.get(args.model, DEFAULT_AUGMENTATION) if augmented else None
+    if args.shards:
+        directory = shard_dir(args.shards, split, get_input_size(args.model), args.shard_encoding)
+        ds = shard_dataset(directory, args.batch_size, training=augmented, model_name=args.model,
+                           augmentation=augmentation)
+        ds = ds.map(lambda x, y: (x, tf.argmax(y, axis=1)), num_parallel_calls=tf.data.AUTOTUNE)
+        return ds, read_meta(directory)["count"]
+    entries = splits[1][split]
+    paths = [os.path.join(args.data_dir, rel_path) for rel_path, _ in entries]
+    labels = np.array([label for _, label in entries], dtype=np.int64)
+    # Augmented passes go through the training branch, which also shuffles; labels travel with the images.
+    return build_dataset(paths, labels, get_input_size(args.model), args.batch_size, training=augmented,
+                         model_name=args.model, augmentation=augmentation), len(entries)
+
+
+def extract(args):
+    if args.shards:
+        class_names = read_meta(shard_dir(args.shards, "train", get_input_size(args.model),
+                                          args.shard_encoding))["class_names"]
+        splits = None
+    else:
+        splits = list_splits(args.data_dir)
+        class_names = splits[0]
+    backbone = build_backbone(args.model)
+    feature_dim = int(backbone.output.shape[-1])
+    os.makedirs(os.path.join(args.cache_dir, args.model), exist_ok=True)
+
+    counts = {}
+    for split in SPLITS:
+        for copy in range(args.copies if split == "train" else 1):
+            features_path = _features_path(args.cache_dir, args.model, split, copy)
+            labels_path = _labels_path(args.cache_dir, args.model, split, copy)
+            if os.path.exists(labels_path):
+                counts[f"{split}_{copy}"] = len(np.load(labels_path, mmap_mode="r"))
+                print(f"{split} copy {copy}: cached")
+                continue
+            ds, count = _image_batches(args, split, copy > 0, splits)
+            features = np.lib.format.open_memmap(features_path + ".tmp", mode="w+", dtype=FEATURES_DTYPE,
+                                                 shape=(count, feature_dim))
+            labels = np.empty(count, dtype=np.int64)
+            done = 0
+            started = time.perf_counter()
+            for images, batch_labels in ds:
+                n = len(batch_labels)
+                features[done:done + n] = np.asarray(backbone.predict_on_batch(images))
+                labels[done:done + n] = batch_labels.numpy()
+                done += n
+                print(f"\r{split} copy {copy}: {done}/{count}", end="", flush=True)
+            features.flush()
+            del features
+            os.replace(features_path + ".tmp", features_path)
+            # The labels file is written last and marks the copy as complete.
+            np.save(labels_path, labels[:done])
+            counts[f"{split}_{copy}"] = done
+            print(f"\r{split} copy {copy}: {done} images in {time.perf_counter() - started:.0f}s")
+
+    with open(os.path.join(args.cache_dir, args.model, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"model": args.model, "backbone": "imagenet", "input_size": list(get_input_size(args.model)),
+                   "feature_dim": feature_dim, "class_names": class_names, "copies": args.copies,
+                   "counts": counts}, f, indent=2)
+
+
+def load_features(cache_dir, model_name, split, copies=1):
+    """Features and labels of a split, copies 0..copies-1 stacked; the files are memory-mapped."""
+    features, labels = [], []
+    for copy in range(copies):
+        path = _labels_path(cache_dir, model_name, split, copy)
+        if not os.path.exists(path):
+            sys.exit(f"Missing {path}; run `python -m tools.head_features extract --model {model_name}` first")
+        labels.append(np.load(path, mmap_mode="r"))
+        features.append(np.load(_features_path(cache_dir, model_name, split, copy), mmap_mode="r")[:len(labels[-1])])
+    if copies == 1:
+        return features[0], labels[0]
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def fit_head(train, val, num_classes, lr, units, dropout, epochs, batch_size, patience):
+    head = build_head(train[0].shape[1], num_classes, units, dropout)
+    head.compile(optimizer=Adam(lr), loss="sparse_categorical_crossentropy", metrics=["accuracy"])
+    early_stop = EarlyStopping(monitor="val_accuracy", patience=patience, restore_best_weights=True)
+    history = head.fit(train[0], train[1], validation_data=(val[0], val[1]), epochs=epochs, batch_size=batch_size,
+                       shuffle=True, callbacks=[early_stop], verbose=0)
+    return head, max(history.history["val_accuracy"]), len(history.history["val_accuracy"])
+
+
+def train(args):
+    with open(os.path.join(args.cache_dir, args.model, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    copies = min(args.copies or meta["copies"], meta["copies"])
+    num_classes = len(meta["class_names"])
+    # A few hundred MB at most even with several copies: read once into float32 for the sweep.
+    train_set, val_set, test_set = [(np.asarray(x, dtype=np.float32), np.asarray(y)) for x, y in (
+        load_features(args.cache_dir, args.model, "train", copies),
+        load_features(args.cache_dir, args.model, "val"),
+        load_features(args.cache_dir, args.model, "test"))]
+    print(f"{args.model}: {len(train_set[1])} train features ({copies} copies), {len(val_set[1])} val, "
+          f"{len(test_set[1])} test, dim {meta['feature_dim']}")
+
+    units_default, dropout_default = NOTEBOOK_HEADS[args.model]
+    runs, best = [], None
+    for lr, units, dropout in itertools.product(args.lr, args.units or [units_default],
+                                                args.dropout or [dropout_default]):
+        started = time.perf_counter()
+        head, val_accuracy, epochs = fit_head(train_set, val_set, num_classes, lr, units, dropout, args.epochs,
+                                              args.batch_size, args.patience)
+        seconds = time.perf_counter() - started
+        test_probs = head.predict(test_set[0], batch_size=1024, verbose=0)
+        test_accuracy = float(np.mean(np.argmax(test_probs, axis=1) == test_set[1]))
+        run = {"lr": lr, "units": units, "dropout": dropout, "epochs": epochs, "val_accuracy": float(val_accuracy),
+               "test_accuracy": test_accuracy, "seconds": seconds}
+        runs.append(run)
+        print(f"lr {lr:g} | units {units} | dropout {dropout:g} | {epochs} epochs in {seconds:.1f}s | "
+              f"val {val_accuracy:.2%} | test {test_accuracy:.2%}")
+        if best is None or run["val_accuracy"] > best[0]["val_accuracy"]:
+            best = (run, head)
+
+    run, head = best
+    print(f"Best on val: lr {run['lr']:g}, units {run['units']}, dropout {run['dropout']:g} "
+          f"(test {run['test_accuracy']:.2%})")
+    os.makedirs(args.output_dir, exist_ok=True)
+    head_path = os.path.join(args.output_dir, f"{args.model}_head.keras")
+    head.save(head_path)
+    info = {"model": args.model, "backbone": meta["backbone"], "input_size": meta["input_size"],
+            "feature_dim": meta["feature_dim"], "train_copies": copies, "best": run, "sweep": runs,
+            "created": datetime.now().isoformat(timespec="seconds")}
+    with open(os.path.join(args.output_dir, f"{args.model}_head.json"), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    print(f"Head written to {head_path}")
+    if args.attach:
+        full_path = os.path.join(args.output_dir, f"{args.model}_stage1.keras")
+        attach_head(args.model, head).save(full_path)
+        print(f"Backbone + head written to {full_path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cache frozen-backbone features and train the head on them.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ext = sub.add_parser("extract", help="Run the frozen backbone once and cache pooled features")
+    source = ext.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data-dir", help="Folder with train/ and test/ class folders")
+    source.add_argument("--shards", help="Root folder written by tools.prepare_dataset")
+    ext.add_argument("--shard-encoding", choices=ENCODINGS, default="raw")
+    ext.add_argument("--model", default="EfficientNetB4", choices=sorted(MODEL_FILES))
+    ext.add_argument("--copies", type=int, default=1,
+                     help="Train copies: the plain images plus N-1 augmented passes")
+    ext.add_argument("--cache-dir", default="feature_cache")
+    ext.add_argument("--batch-size", type=int, default=32)
+
+    fit = sub.add_parser("train", help="Train (or sweep) the head on cached features and export it")
+    fit.add_argument("--model", default="EfficientNetB4", choices=sorted(MODEL_FILES))
+    fit.add_argument("--cache-dir", default="feature_cache")
+    fit.add_argument("--copies", type=int, default=0, help="Train copies to use (0 = all cached)")
+    fit.add_argument("--lr", type=float, nargs="+", default=[1e-3])
+    fit.add_argument("--units", type=int, nargs="+", help="Dense units, 0 for none (default: notebook head)")
+    fit.add_argument("--dropout", type=float, nargs="+", help="Default: notebook head")
+    fit.add_argument("--epochs", type=int, default=30)
+    fit.add_argument("--patience", type=int, default=5, help="Early stopping on val accuracy")
+    fit.add_argument("--batch-size", type=int, default=64)
+    fit.add_argument("--output-dir", default="heads")
+    fit.add_argument("--attach", action="store_true", help="Also save the backbone with the best head")
+    args = parser.parse_args(argv)
+    if args.command == "extract" and args.copies < 1:
+        parser.error("--copies must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "extract":
+        extract(args)
+    else:
+        train(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Measures training input throughput: the notebooks' ImageDataGenerator against the
+tf.data pipeline in utils.training_data.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.input_benchmark --data-dir path/to/car_data/car_data --model EfficientNetB4
+    python -m tools.input_benchmark --data-dir ... --model ResNet50 --batches 200 --output input_bench.json
+
+Every pipeline produces the same batches the notebooks train on (batch size 16,
+the model's input size, its augmentation and normalisation) and is timed over
+--batches batches after a short warm-up, without a model, so the numbers are
+the input side alone:
+
+  generator       ImageDataGenerator.flow_from_directory, as in the notebooks
+  tf.data         parallel decode + resize, batched augmentation, prefetch
+  tf.data+cache   the same with decoded, resized images cached to a file: one
+                  full pass fills the cache (reported as "fill"), then later
+                  epochs read uint8 pixels instead of JPEGs
+  shards          the pre-resized TFRecord shards of tools.prepare_dataset,
+                  with --shards <root> (added to the run when given)
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import tensorflow as tf
+
+from utils.model_helper import MODEL_FILES, get_input_size, get_keras_preprocessor
+from utils.dataset_shards import ENCODINGS, prepared_dataset
+from utils.training_data import AUGMENTATION, list_splits, folder_dataset
+
+PIPELINES = ("generator", "tf.data", "tf.data+cache", "shards")
+
+
+def time_batches(iterator, batches, warmup, batch_size):
+    for _ in range(warmup):
+        next(iterator)
+    started = time.perf_counter()
+    for _ in range(batches):
+        next(iterator)
+    elapsed = time.perf_counter() - started
+    return {"batches": batches, "seconds": elapsed, "images_per_s": batches * batch_size / elapsed}
+
+
+def generator_iterator(data_dir, model_name, batch_size):
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+    aug = AUGMENTATION[model_name]
+    gen = ImageDataGenerator(preprocessing_function=get_keras_preprocessor(model_name),
+                             rotation_range=aug["rotation"], zoom_range=aug["zoom"],
+                             width_shift_range=aug["shift"], height_shift_range=aug["shift"],
+                             horizontal_flip=aug["flip"])
+    width, height = get_input_size(model_name)
+    return gen.flow_from_directory(os.path.join(data_dir, "train"), target_size=(height, width),
+                                   batch_size=batch_size, class_mode="categorical", shuffle=True)
+
+
+def run(args):
+    splits = list_splits(args.data_dir)
+    results = {}
+    for pipeline in args.pipelines:
+        if pipeline == "generator":
+            iterator = generator_iterator(args.data_dir, args.model, args.batch_size)
+            results[pipeline] = time_batches(iterator, args.batches, args.warmup, args.batch_size)
+        elif pipeline == "tf.data":
+            ds, _, _ = folder_dataset(args.data_dir, "train", args.model, args.batch_size, splits=splits)
+            results[pipeline] = time_batches(iter(ds.repeat()), args.batches, args.warmup, args.batch_size)
+        elif pipeline == "shards":
+            ds, _, _ = prepared_dataset(args.shards, "train", args.model, args.batch_size, args.shard_encoding)
+            results[pipeline] = time_batches(iter(ds.repeat()), args.batches, args.warmup, args.batch_size)
+        else:
+            cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="input_cache_")
+            try:
+                ds, _, entries = folder_dataset(args.data_dir, "train", args.model, args.batch_size,
+                                                cache_dir=cache_dir, splits=splits)
+                # The cache file is only complete after one whole epoch.
+                started = time.perf_counter()
+                for _ in ds:
+                    pass
+                fill_s = time.perf_counter() - started
+                results[pipeline] = time_batches(iter(ds.repeat()), args.batches, args.warmup, args.batch_size)
+                results[pipeline]["fill_images_per_s"] = len(entries) / fill_s
+            finally:
+                if not args.cache_dir:
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+        r = results[pipeline]
+        fill = f" | fill {r['fill_images_per_s']:.0f} img/s" if "fill_images_per_s" in r else ""
+        print(f"{pipeline:<15} {r['images_per_s']:8.0f} img/s{fill}")
+
+    if "generator" in results:
+        base = results["generator"]["images_per_s"]
+        for pipeline, r in results.items():
+            r["speedup_vs_generator"] = r["images_per_s"] / base
+            if pipeline != "generator":
+                print(f"{pipeline} is {r['speedup_vs_generator']:.1f}x the generator")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare ImageDataGenerator and tf.data input throughput.")
+    parser.add_argument("--data-dir", required=True, help="Folder with train/ and test/ class folders")
+    parser.add_argument("--model", default="EfficientNetB4", choices=sorted(MODEL_FILES))
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batches", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--cache-dir", help="Keep the tf.data cache here (default: a temporary folder)")
+    parser.add_argument("--shards", help="Root folder written by tools.prepare_dataset")
+    parser.add_argument("--shard-encoding", choices=ENCODINGS, default="raw")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    if args.pipelines is None:
+        args.pipelines = [p for p in PIPELINES if p != "shards" or args.shards]
+    elif "shards" in args.pipelines and not args.shards:
+        parser.error("the shards pipeline needs --shards")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"{args.model}, batch size {args.batch_size}, {os.cpu_count()} CPUs, TensorFlow {tf.__version__}")
+    results = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"model": args.model, "batch_size": args.batch_size, "cpu_count": os.cpu_count(),
+                       "tensorflow": tf.__version__, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Records webcam sessions and replays them (or a video / image folder) through the
+Real-Time page's per-frame work, without a browser or a camera.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.live_replay record --output recordings/street.cxrec --seconds 30
+    python -m tools.live_replay run recordings/street.cxrec --model ResNet50          # max speed
+    python -m tools.live_replay run clips/parking.mp4 --model Cascade --speed 1      # original timing
+    python -m tools.live_replay run recordings/street.cxrec --standin --output live.json
+
+`run` feeds every frame through the same steps as the live loop: inference on
+every SKIP_FRAMES-th frame (cv2 -> PIL, smart_preprocess, model call or
+cascade), the label overlay and the display resize/convert. It reports FPS,
+per-frame and inference latency percentiles and the detections above
+--threshold. At max speed (the default) the detections depend only on the
+recording and the model, so two runs on the same machine are comparable.
+
+--standin uses the notebook architectures with random weights (tools.benchmark)
+for machines without the trained models; detections are then meaningless but
+the timings are representative. The Real-Time page itself reads from the same
+sources with CARXPLAIN_FRAME_SOURCE (and CARXPLAIN_FRAME_SPEED), and records
+camera sessions into CARXPLAIN_RECORD_DIR when that is set.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+from PIL import Image
+
+from utils.class_names import CAR_CLASSES
+from utils.frame_source import open_frame_source, FrameRecorder, CameraSource
+from utils.model_helper import MODEL_FILES, MODELS_DIR, load_custom_model, smart_preprocess, cascade_predict
+
+SKIP_FRAMES = 5
+MODEL_CHOICES = sorted(MODEL_FILES) + ["Cascade"]
+
+
+def record(args):
+    source = CameraSource(args.camera)
+    if not source.isOpened():
+        sys.exit(f"Camera {args.camera} is not available")
+    print(f"Recording camera {args.camera} for {args.seconds:.0f}s to {args.output} (Ctrl+C stops early)")
+    started = time.perf_counter()
+    try:
+        with FrameRecorder(args.output, quality=args.quality) as recorder:
+            while time.perf_counter() - started < args.seconds:
+                ok, frame = source.read()
+                if not ok:
+                    break
+                recorder.write(frame)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.release()
+    size_mb = os.path.getsize(args.output) / 1e6
+    print(f"{recorder.frames} frames, {size_mb:.1f} MB")
+
+
+def load_models(model_name, standin):
+    if standin:
+        from tools.benchmark import build_standin
+        load = build_standin
+    else:
+        def load(name):
+            path = os.path.join(MODELS_DIR, MODEL_FILES[name])
+            if not os.path.exists(path):
+                sys.exit(f"{path} not found; use --standin to run without the trained models")
+            return load_custom_model(path)
+    if model_name == "Cascade":
+        return {name: load(name) for name in MODEL_FILES}
+    return {model_name: load(model_name)}
+
+
+def percentiles(seconds):
+    if not seconds:
+        return None
+    ms = 1000 * np.asarray(seconds)
+    return {"p50_ms": float(np.percentile(ms, 50)), "p90_ms": float(np.percentile(ms, 90)),
+            "p99_ms": float(np.percentile(ms, 99)), "mean_ms": float(ms.mean())}
+
+
+def run(args):
+    import cv2
+
+    models = load_models(args.model, args.standin)
+    model = None if args.model == "Cascade" else models[args.model]
+    source = open_frame_source(args.source, speed=args.speed, loop=args.frames > 0)
+    if not source.isOpened():
+        sys.exit(f"Cannot read frames from {args.source}")
+
+    frame_times, inference_times = [], []
+    detections = Counter()
+    label_text, color = "Scanning...", (100, 100, 100)
+    frame_count = 0
+    started = time.perf_counter()
+    try:
+        while not args.frames or frame_count < args.frames:
+            ok, frame = source.read()
+            if not ok:
+                break
+            frame_started = time.perf_counter()
+            if frame_count % SKIP_FRAMES == 0:
+                pil_img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                inference_started = time.perf_counter()
+                if model is None:
+                    preds, _ = cascade_predict(pil_img, models)
+                else:
+                    preds = np.asarray(model(smart_preprocess(pil_img, args.model), training=False))
+                inference_times.append(time.perf_counter() - inference_started)
+                top_idx = int(np.argmax(preds[0]))
+                if preds[0][top_idx] >= args.threshold:
+                    detections[CAR_CLASSES[top_idx]] += 1
+                    label_text, color = f"{CAR_CLASSES[top_idx]}: {preds[0][top_idx]:.1%}", (0, 204, 255)
+                else:
+                    label_text, color = "Scanning...", (100, 100, 100)
+            cv2.rectangle(frame, (10, 10), (320, 60), (0, 0, 0), -1)
+            cv2.putText(frame, label_text, (20, 45), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+            cv2.cvtColor(cv2.resize(frame, (640, 480)), cv2.COLOR_BGR2RGB)
+            frame_times.append(time.perf_counter() - frame_started)
+            frame_count += 1
+    finally:
+        source.release()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "source": args.source,
+        "model": args.model,
+        "standin": args.standin,
+        "speed": args.speed,
+        "threshold": args.threshold,
+        "frames": frame_count,
+        "elapsed_s": elapsed,
+        "fps": frame_count / elapsed if elapsed > 0 else 0.0,
+        "frame_latency": percentiles(frame_times),
+        "inference_latency": percentiles(inference_times),
+        "inferences": len(inference_times),
+        "detections": sum(detections.values()),
+        "detections_by_class": dict(detections.most_common()),
+    }
+
+
+def print_result(result):
+    print(f"{result['frames']} frames in {result['elapsed_s']:.1f}s: {result['fps']:.1f} FPS")
+    for name in ("frame_latency", "inference_latency"):
+        r = result[name]
+        if r is not None:
+            print(f"{name:<18} p50 {r['p50_ms']:7.1f} ms | p90 {r['p90_ms']:7.1f} | p99 {r['p99_ms']:7.1f}")
+    print(f"{result['detections']} detections in {result['inferences']} inferences")
+    for car, n in list(result["detections_by_class"].items())[:10]:
+        print(f"    {n:4d}  {car}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Record camera sessions and replay them through the live loop.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record a camera session to a .cxrec file")
+    rec.add_argument("--output", required=True)
+    rec.add_argument("--camera", type=int, default=0)
+    rec.add_argument("--seconds", type=float, default=60, help="The page's sessions last 60 s")
+    rec.add_argument("--quality", type=int, default=80, help="JPEG quality of the stored frames")
+
+    play = sub.add_parser("run", help="Replay a recording, video or image folder through the live loop")
+    play.add_argument("source", help="A .cxrec recording, a video file or a folder/ZIP/TAR of images")
+    play.add_argument("--model", default="EfficientNetB4", choices=MODEL_CHOICES)
+    play.add_argument("--standin", action="store_true", help="Random-weight models, no trained files needed")
+    play.add_argument("--speed", type=float, default=0, help="1 = original timing, 0 = as fast as possible")
+    play.add_argument("--frames", type=int, default=0, help="Stop after N frames, looping the source (0 = once)")
+    play.add_argument("--threshold", type=float, default=0.4, help="The page's default confidence threshold")
+    play.add_argument("--output", help="Write the result as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "record":
+        record(args)
+        return
+    result = run(args)
+    print_result(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Result written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
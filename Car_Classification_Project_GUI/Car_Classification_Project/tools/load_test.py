@@ -0,0 +1,277 @@
+"""
+Simulates many concurrent users of the Image Analysis and Model Comparison pages.
+
+Run from the Car_Classification_Project folder (needs the trained models in models/):
+
+    python -m tools.load_test --users 8 --duration 120
+    python -m tools.load_test --users 16 --pages analysis --images path/to/cars --output load_v2.json
+    python -m tools.load_test --users 8 --compare load_v1.json
+
+Every virtual user is a Streamlit AppTest session on a real page, all of them in
+this one process, the way sessions share one Streamlit server and its cached
+models. Each user loops: open the page, "upload" an image, click the analysis
+button, wait for the result, think for a moment and start again, switching
+models between rounds on the analysis page.
+
+The report holds per action the p50/p90/p99 latency, throughput and error rate,
+plus the process RSS sampled over the whole run. --compare prints the p90 and
+error rate change against an earlier report and exits with 1 on a regression.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from tools.benchmark import rss_mb, environment
+from utils.image_sources import iter_image_entries
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    "analysis": os.path.join(PROJECT_DIR, "pages", "1_📷_Image_Analysis.py"),
+    "comparison": os.path.join(PROJECT_DIR, "pages", "3_📊_Model_Comparison.py"),
+}
+ANALYSIS_MODELS = ("InceptionV3", "ResNet50", "EfficientNetB4", "Cascade")
+
+
+def load_images(source, count, seed):
+    """JPEG bytes from a folder/archive, or synthetic photos when no source is given."""
+    images = []
+    if source:
+        for _, read_bytes in iter_image_entries(source):
+            images.append(read_bytes())
+            if len(images) == count:
+                break
+    rng = np.random.default_rng(seed)
+    while len(images) < count:
+        buffer = io.BytesIO()
+        Image.fromarray(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)).save(buffer, format="JPEG")
+        images.append(buffer.getvalue())
+    return images
+
+
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    if at.error:
+        raise RuntimeError(at.error[0].value)
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, user_id, page, images, args, records, stop):
+        super().__init__(name=f"user-{user_id}", daemon=True)
+        self.user_id, self.page, self.images, self.args = user_id, page, images, args
+        self.records, self.stop = records, stop
+        self.rng = random.Random(args.seed + user_id)
+
+    def timed_action(self, action, fn):
+        started = time.perf_counter()
+        error = None
+        try:
+            fn()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        self.records.append({"user": self.user_id, "page": self.page, "action": action,
+                             "start": started, "latency_s": time.perf_counter() - started, "error": error})
+        return error is None
+
+    def think(self):
+        self.stop.wait(self.rng.uniform(self.args.think_min, self.args.think_max))
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        round_no = 0
+        while not self.stop.is_set() and (not self.args.iterations or round_no < self.args.iterations):
+            at = AppTest.from_file(PAGES[self.page], default_timeout=self.args.timeout)
+            if not self.timed_action("open", lambda: (at.run(), _check(at))):
+                self.think()
+                continue
+            image = self.rng.choice(self.images)
+            if self.page == "analysis":
+                model = ANALYSIS_MODELS[(self.user_id + round_no) % len(ANALYSIS_MODELS)]
+                self.round_analysis(at, image, model)
+            else:
+                self.round_comparison(at, image)
+            round_no += 1
+            self.think()
+
+    def round_analysis(self, at, image, model):
+        def upload():
+            # AppTest cannot drive st.file_uploader; this is what its on_change callback stores.
+            at.session_state["img_bytes_current"] = image
+            at.session_state["analysis_result"] = None
+            next(s for s in at.selectbox if s.label == "Select Model Architecture").set_value(model)
+            at.run()
+            _check(at)
+
+        def analyse():
+            _button(at, "START ANALYSIS").click().run()
+            _check(at)
+            if at.session_state["analysis_result"] is None:
+                raise RuntimeError("no analysis result")
+
+        if self.timed_action("upload", upload):
+            self.think()
+            self.timed_action(f"analyse:{model}", analyse)
+
+    def round_comparison(self, at, image):
+        def upload():
+            at.session_state["comp_img_bytes"] = image
+            at.session_state["comp_results"] = None
+            at.run()
+            _check(at)
+
+        def compare_models():
+            _button(at, "RUN BENCHMARK").click().run()
+            _check(at)
+            if not at.session_state["comp_results"]:
+                raise RuntimeError("no comparison results")
+
+        if self.timed_action("upload", upload):
+            self.think()
+            self.timed_action("compare", compare_models)
+
+
+def sample_rss(samples, stop, started, interval):
+    while not stop.wait(interval):
+        samples.append((time.perf_counter() - started, rss_mb()))
+
+
+def summarize(records, started, finished):
+    groups = {}
+    for record in records:
+        groups.setdefault(f"{record['page']}/{record['action']}", []).append(record)
+    summary = {}
+    for name, group in sorted(groups.items()):
+        ok = [r["latency_s"] for r in group if r["error"] is None]
+        ms = 1000 * np.asarray(ok) if ok else None
+        errors = [r["error"] for r in group if r["error"] is not None]
+        summary[name] = {
+            "requests": len(group),
+            "errors": len(errors),
+            "error_rate": len(errors) / len(group),
+            "p50_ms": float(np.percentile(ms, 50)) if ok else None,
+            "p90_ms": float(np.percentile(ms, 90)) if ok else None,
+            "p99_ms": float(np.percentile(ms, 99)) if ok else None,
+            "throughput_per_min": 60 * len(ok) / (finished - started),
+            "sample_errors": sorted(set(errors))[:5],
+        }
+    return summary
+
+
+def print_summary(summary, rss):
+    for name, s in summary.items():
+        latency = (f"p50 {s['p50_ms']:8.0f} | p90 {s['p90_ms']:8.0f} | p99 {s['p99_ms']:8.0f} ms"
+                   if s["p50_ms"] is not None else "no successful request".ljust(47))
+        print(f"{name:<32} {s['requests']:5d} req | {latency} | {s['throughput_per_min']:6.1f}/min | "
+              f"errors {s['error_rate']:.1%}")
+        for error in s["sample_errors"]:
+            print(f"    {error}")
+    values = [mb for _, mb in rss if mb is not None]
+    if values:
+        print(f"RSS: start {values[0]:.0f} MB | peak {max(values):.0f} MB | end {values[-1]:.0f} MB")
+
+
+def compare(baseline_path, summary, p90_threshold, error_threshold):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nAgainst {baseline['environment']['revision']} ({baseline_path}):")
+    regressed = False
+    for name, s in summary.items():
+        before = baseline["summary"].get(name)
+        if before is None or before["p90_ms"] is None or s["p90_ms"] is None:
+            print(f"{name:<32} not comparable")
+            continue
+        change = s["p90_ms"] / before["p90_ms"] - 1
+        error_change = s["error_rate"] - before["error_rate"]
+        bad = change > p90_threshold or error_change > error_threshold
+        regressed |= bad
+        print(f"{name:<32} p90 {before['p90_ms']:8.0f} -> {s['p90_ms']:8.0f} ms ({change:+.1%}) | "
+              f"errors {before['error_rate']:.1%} -> {s['error_rate']:.1%}{'  REGRESSION' if bad else ''}")
+    return regressed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the analysis pages with concurrent virtual users.")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--pages", nargs="+", default=sorted(PAGES), choices=sorted(PAGES),
+                        help="Users are spread over these pages round-robin")
+    parser.add_argument("--duration", type=float, default=120, help="Seconds to run (0 = until --iterations)")
+    parser.add_argument("--iterations", type=int, default=0, help="Rounds per user (0 = until --duration)")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Seconds over which users join")
+    parser.add_argument("--think-min", type=float, default=0.5)
+    parser.add_argument("--think-max", type=float, default=2.0)
+    parser.add_argument("--images", help="Folder or archive with test photos (default: synthetic)")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-run AppTest timeout in seconds")
+    parser.add_argument("--rss-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test_report.json")
+    parser.add_argument("--compare", help="Earlier report to compare with")
+    parser.add_argument("--p90-threshold", type=float, default=0.15)
+    parser.add_argument("--error-threshold", type=float, default=0.01)
+    args = parser.parse_args(argv)
+    if not args.duration and not args.iterations:
+        parser.error("set --duration or --iterations")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    images = load_images(args.images, 16, args.seed)
+    records, rss = [], []
+    stop = threading.Event()
+    started = time.perf_counter()
+    threading.Thread(target=sample_rss, args=(rss, stop, started, args.rss_interval), daemon=True).start()
+
+    users = [VirtualUser(i, args.pages[i % len(args.pages)], images, args, records, stop)
+             for i in range(args.users)]
+    for i, user in enumerate(users):
+        user.start()
+        if i < len(users) - 1:
+            time.sleep(args.ramp_up / max(1, len(users) - 1))
+
+    try:
+        deadline = started + args.duration if args.duration else None
+        while any(user.is_alive() for user in users):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("Interrupted, writing the report for what ran so far.")
+    stop.set()
+    # Requests still running finish (and are recorded) before the report is written.
+    for user in users:
+        user.join(timeout=args.timeout)
+    finished = time.perf_counter()
+
+    summary = summarize(records, started, finished)
+    print_summary(summary, rss)
+    report = {
+        "environment": environment(),
+        "settings": {k: v for k, v in vars(args).items() if k != "compare"},
+        "duration_s": finished - started,
+        "summary": summary,
+        "rss_mb": [[round(t, 2), mb] for t, mb in rss],
+        "requests": [dict(r, start=r["start"] - started) for r in records],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare and compare(args.compare, summary, args.p90_threshold, args.error_threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
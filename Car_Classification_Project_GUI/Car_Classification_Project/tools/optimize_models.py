@@ -0,0 +1,265 @@
+"""
+Produces pruned and weight-clustered variants of the trained models and compares them.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.optimize_models --data-dir path/to/car_data/car_data \\
+        --models EfficientNetB4 ResNet50 --variants prune:0.5 channels:0.3 cluster:32
+
+Variants:
+    prune:S     zero the fraction S of smallest-magnitude weights in each conv/dense kernel
+    channels:S  zero the fraction S of output channels with the smallest L1 norm (structured)
+    cluster:K   share K values per kernel (1-D k-means), so kernels compress to K floats + indices
+
+Each variant gets a short fine-tune on the notebooks' train/ split with the
+sparsity or clusters re-applied as it trains, is saved as .keras, reloaded and
+evaluated on the notebooks' test half. Size, gzip size, load time, CPU latency
+and top-1 are printed and written to <output-dir>/optimization_report.json.
+
+Weights are stored dense, so pruning pays off in the compressed size; CPU
+latency only drops with a runtime that exploits sparsity.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+from tensorflow.keras.optimizers import Adam
+
+from tools.distill import measure_latency
+from utils.model_helper import MODEL_FILES, MODELS_DIR, get_input_size, get_keras_preprocessor
+
+PRUNABLE_LAYERS = (tf.keras.layers.Conv2D, tf.keras.layers.DepthwiseConv2D, tf.keras.layers.Dense)
+MIN_PARAMS = 1024
+
+
+def _prunable_layers(model):
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.Model):
+            yield from _prunable_layers(layer)
+        elif isinstance(layer, PRUNABLE_LAYERS) and layer.get_weights() and layer.get_weights()[0].size >= MIN_PARAMS:
+            yield layer
+
+
+def _channel_axis(layer, kernel):
+    # Depthwise kernels are (h, w, channels, multiplier); the rest keep output channels last.
+    return 2 if isinstance(layer, tf.keras.layers.DepthwiseConv2D) else kernel.ndim - 1
+
+
+def magnitude_mask(kernel, sparsity):
+    threshold = np.quantile(np.abs(kernel), sparsity)
+    return np.abs(kernel) > threshold
+
+
+def channel_mask(kernel, sparsity, axis):
+    norms = np.abs(kernel).sum(axis=tuple(i for i in range(kernel.ndim) if i != axis))
+    n_pruned = int(sparsity * norms.size)
+    keep = np.ones(norms.size, dtype=bool)
+    keep[np.argsort(norms)[:n_pruned]] = False
+    shape = [1] * kernel.ndim
+    shape[axis] = norms.size
+    return np.broadcast_to(keep.reshape(shape), kernel.shape)
+
+
+def kmeans_1d(values, k, iterations=15):
+    """Linear-init 1-D k-means; returns (centroids, assignments)."""
+    flat = values.ravel()
+    centroids = np.linspace(flat.min(), flat.max(), k)
+    for _ in range(iterations):
+        assignments = np.digitize(flat, (centroids[1:] + centroids[:-1]) / 2)
+        sums = np.bincount(assignments, weights=flat, minlength=k)
+        counts = np.bincount(assignments, minlength=k)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled]
+        centroids.sort()
+    assignments = np.digitize(flat, (centroids[1:] + centroids[:-1]) / 2)
+    return centroids, assignments.reshape(values.shape)
+
+
+class _Compression:
+    """Applies one variant to a model and keeps it applied while fine-tuning."""
+
+    def __init__(self, model, kind, amount):
+        self.kind, self.amount = kind, amount
+        self.state = {}
+        output_layer = model.layers[-1]
+        for layer in _prunable_layers(model):
+            weights = layer.get_weights()
+            kernel = weights[0]
+            if kind == "prune":
+                self.state[layer] = magnitude_mask(kernel, amount)
+            elif kind == "channels":
+                if layer is output_layer:
+                    continue  # removing output units would remove classes
+                self.state[layer] = channel_mask(kernel, amount, _channel_axis(layer, kernel))
+            else:
+                self.state[layer] = kmeans_1d(kernel, int(amount))[1]
+        self.apply()
+
+    def apply(self):
+        for layer, state in self.state.items():
+            weights = layer.get_weights()
+            if self.kind == "cluster":
+                # Centroids follow the fine-tuned weights; the assignments stay fixed.
+                counts = np.bincount(state.ravel(), minlength=int(self.amount))
+                sums = np.bincount(state.ravel(), weights=weights[0].ravel(), minlength=int(self.amount))
+                centroids = sums / np.maximum(counts, 1)
+                weights[0] = centroids[state].astype(weights[0].dtype)
+            else:
+                weights[0] = weights[0] * state
+            layer.set_weights(weights)
+
+    def sparsity(self):
+        total = zeros = 0
+        for layer in self.state:
+            kernel = layer.get_weights()[0]
+            total += kernel.size
+            zeros += int(np.count_nonzero(kernel == 0))
+        return zeros / total if total else 0.0
+
+
+class _KeepCompressed(tf.keras.callbacks.Callback):
+    def __init__(self, compression):
+        super().__init__()
+        self.compression = compression
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self.compression.kind != "cluster":
+            self.compression.apply()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.compression.apply()
+
+
+def make_generators(data_dir, model_name, batch_size):
+    """train/ with the notebooks' augmentation, and test/ halved into validation and test."""
+    preprocess = get_keras_preprocessor(model_name)
+    target_size = get_input_size(model_name)[::-1]
+    train_gen = ImageDataGenerator(
+        preprocessing_function=preprocess,
+        rotation_range=15,
+        zoom_range=0.1,
+        width_shift_range=0.1,
+        height_shift_range=0.1,
+        horizontal_flip=True
+    )
+    val_test_gen = ImageDataGenerator(preprocessing_function=preprocess, validation_split=0.5)
+    train_data = train_gen.flow_from_directory(os.path.join(data_dir, "train"), target_size=target_size,
+                                               batch_size=batch_size, class_mode="categorical", shuffle=True)
+    test_data = val_test_gen.flow_from_directory(os.path.join(data_dir, "test"), target_size=target_size,
+                                                 batch_size=batch_size, class_mode="categorical",
+                                                 subset="training", shuffle=False)
+    return train_data, test_data
+
+
+def evaluate_top1(model, test_data, max_batches=None):
+    steps = len(test_data) if max_batches is None else min(max_batches, len(test_data))
+    correct = seen = 0
+    for i in range(steps):
+        images, labels = test_data[i]
+        preds = np.asarray(model.predict_on_batch(images))
+        correct += int(np.sum(np.argmax(preds, axis=1) == np.argmax(labels, axis=1)))
+        seen += len(images)
+    return correct / seen if seen else 0.0
+
+
+def _gzip_size(path):
+    with open(path, "rb") as f:
+        return len(gzip.compress(f.read(), compresslevel=6))
+
+
+def measure_variant(path, model_name, test_data, eval_batches, runs):
+    started = time.perf_counter()
+    model = tf.keras.models.load_model(path)
+    load_s = time.perf_counter() - started
+    return model, {
+        "file_mb": os.path.getsize(path) / 1e6,
+        "gzip_mb": _gzip_size(path) / 1e6,
+        "load_s": load_s,
+        "latency_ms": measure_latency(model, model_name, runs),
+        "top1": evaluate_top1(model, test_data, eval_batches),
+    }
+
+
+def parse_variant(text):
+    kind, _, amount = text.partition(":")
+    if kind not in ("prune", "channels", "cluster") or not amount:
+        raise argparse.ArgumentTypeError(f"Expected prune:S, channels:S or cluster:K, got '{text}'")
+    amount = float(amount)
+    if kind == "cluster" and amount < 2 or kind != "cluster" and not 0 < amount < 1:
+        raise argparse.ArgumentTypeError(f"Out of range: '{text}'")
+    return kind, amount
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Create and compare pruned / clustered model variants.")
+    parser.add_argument("--data-dir", required=True, help="Folder with train/ and test/ class folders")
+    parser.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES))
+    parser.add_argument("--variants", nargs="+", type=parse_variant,
+                        default=[("prune", 0.5), ("channels", 0.3), ("cluster", 32)])
+    parser.add_argument("--output-dir", default=os.path.join(MODELS_DIR, "optimized"))
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--finetune-epochs", type=int, default=1)
+    parser.add_argument("--finetune-steps", type=int, default=200, help="Batches per fine-tune epoch (0 = full)")
+    parser.add_argument("--eval-batches", type=int, default=None, help="Limit test batches for a quicker run")
+    parser.add_argument("--latency-runs", type=int, default=30)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    rows = []
+
+    for model_name in args.models:
+        source = os.path.join(MODELS_DIR, MODEL_FILES[model_name])
+        if not os.path.exists(source):
+            print(f"Skipping {model_name}: {source} not found", file=sys.stderr)
+            continue
+        train_data, test_data = make_generators(args.data_dir, model_name, args.batch_size)
+
+        _, baseline = measure_variant(source, model_name, test_data, args.eval_batches, args.latency_runs)
+        rows.append({"model": model_name, "variant": "baseline", "sparsity": 0.0, **baseline})
+        _print_row(rows[-1])
+
+        for kind, amount in args.variants:
+            variant = f"{kind}-{amount:g}"
+            model = tf.keras.models.load_model(source)
+            compression = _Compression(model, kind, amount)
+            if args.finetune_epochs:
+                model.compile(optimizer=Adam(1e-5),
+                              loss=tf.keras.losses.CategoricalCrossentropy(label_smoothing=0.1),
+                              metrics=["accuracy"])
+                model.fit(train_data, epochs=args.finetune_epochs, steps_per_epoch=args.finetune_steps or None,
+                          callbacks=[_KeepCompressed(compression)], verbose=2)
+            compression.apply()
+            sparsity = compression.sparsity()
+
+            path = os.path.join(args.output_dir, f"{model_name}_{variant}.keras")
+            model.save(path)
+            del model, compression
+            tf.keras.backend.clear_session()
+
+            _, metrics = measure_variant(path, model_name, test_data, args.eval_batches, args.latency_runs)
+            rows.append({"model": model_name, "variant": variant, "sparsity": sparsity, "path": path, **metrics})
+            _print_row(rows[-1])
+
+    report_path = os.path.join(args.output_dir, "optimization_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    print(f"\nReport written to {report_path}")
+
+
+def _print_row(row):
+    print(f"{row['model']:<15} {row['variant']:<14} sparsity {row['sparsity']:6.1%} | "
+          f"{row['file_mb']:7.1f} MB ({row['gzip_mb']:6.1f} MB gz) | load {row['load_s']:5.2f}s | "
+          f"{row['latency_ms']:7.1f} ms | top-1 {row['top1']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
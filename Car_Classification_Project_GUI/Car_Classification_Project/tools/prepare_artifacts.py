@@ -0,0 +1,169 @@
+"""
+Prepares fast-loading copies of the trained models and measures how fast they load.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.prepare_artifacts prepare
+    python -m tools.prepare_artifacts benchmark --runs 3
+
+`prepare` loads each .keras file once and writes models/fast/<name>/ with the
+architecture as JSON (model.json) and all weights in one flat, aligned file
+(weights.bin). The output of the rebuilt model is checked against the original
+on random inputs. load_custom_model picks the folder up automatically and
+memory-maps the weights instead of unpacking the archive; it falls back to the
+.keras file when the folder is missing or older than the .keras file.
+
+`benchmark` loads every model both ways, each in a fresh Python process, and
+prints the load time (TensorFlow import excluded), the RSS after loading and the
+peak RSS. Results go to models/fast/load_report.json.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from utils.model_helper import MODEL_FILES, MODELS_DIR, ARTIFACTS_DIR, artifact_dir_for, save_model_artifact, \
+    load_model_artifact, get_input_size
+
+_MEASURE = """
+import json, os, sys, time
+import tensorflow as tf
+from utils.model_helper import load_model_artifact
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+path, mode = sys.argv[1], sys.argv[2]
+before = rss_mb()
+started = time.perf_counter()
+model = load_model_artifact(path) if mode == "artifact" else tf.keras.models.load_model(path, compile=False)
+load_s = time.perf_counter() - started
+print(json.dumps({"load_s": load_s, "rss_mb": rss_mb(), "rss_delta_mb": rss_mb() - before,
+                  "peak_rss_mb": peak_rss_mb()}))
+"""
+
+
+def max_output_diff(original, rebuilt, model_name, batch_size=2):
+    width, height = get_input_size(model_name)
+    batch = np.random.default_rng(0).uniform(0, 255, (batch_size, height, width, 3)).astype(np.float32)
+    expected = np.asarray(original.predict_on_batch(batch))
+    actual = np.asarray(rebuilt.predict_on_batch(batch))
+    return float(np.max(np.abs(expected - actual)))
+
+
+def prepare(model_names, tolerance):
+    import tensorflow as tf
+
+    failed = False
+    for name in model_names:
+        source = os.path.join(MODELS_DIR, MODEL_FILES[name])
+        if not os.path.exists(source):
+            print(f"{name}: {source} not found, skipped")
+            continue
+        started = time.perf_counter()
+        model = tf.keras.models.load_model(source, compile=False)
+        folder = save_model_artifact(model, source)
+        size_mb = os.path.getsize(os.path.join(folder, "weights.bin")) / 1e6
+        print(f"{name}: wrote {folder} ({size_mb:.1f} MB of weights) in {time.perf_counter() - started:.1f}s")
+
+        max_diff = max_output_diff(model, load_model_artifact(source), name)
+        if max_diff > tolerance:
+            failed = True
+            shutil.rmtree(folder, ignore_errors=True)
+            print(f"{name}: rebuilt model differs by {max_diff:.2e}, artifact removed")
+        else:
+            print(f"{name}: outputs match (max |diff| {max_diff:.2e})")
+        tf.keras.backend.clear_session()
+    return not failed
+
+
+def measure_load(path, mode):
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, "-c", _MEASURE, path, mode], cwd=project_dir,
+                          capture_output=True, text=True)
+    try:
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output"}
+
+
+def _median_run(path, mode, runs):
+    results = [measure_load(path, mode) for _ in range(runs)]
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        return results[0]
+    return sorted(ok, key=lambda r: r["load_s"])[len(ok) // 2]
+
+
+def _format(result):
+    if "error" in result:
+        return f"error: {result['error']}"
+    peak = f"{result['peak_rss_mb']:7.0f} MB" if result["peak_rss_mb"] is not None else "      -"
+    return (f"load {result['load_s']:6.2f}s | RSS {result['rss_mb']:7.0f} MB (+{result['rss_delta_mb']:.0f}) | "
+            f"peak {peak}")
+
+
+def benchmark(model_names, runs):
+    report = []
+    for name in model_names:
+        source = os.path.join(MODELS_DIR, MODEL_FILES[name])
+        if not os.path.exists(source):
+            print(f"{name}: {source} not found, skipped")
+            continue
+        print(name)
+        row = {"model": name, "keras": _median_run(source, "keras", runs)}
+        print(f"  {'.keras':<9} {_format(row['keras'])}")
+        if os.path.exists(os.path.join(artifact_dir_for(source), "model.json")):
+            row["artifact"] = _median_run(source, "artifact", runs)
+            print(f"  {'artifact':<9} {_format(row['artifact'])}")
+        else:
+            print(f"  {'artifact':<9} not prepared")
+        report.append(row)
+
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(os.path.join(ARTIFACTS_DIR, "load_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare and benchmark fast-loading model artifacts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prep = sub.add_parser("prepare", help="Write models/fast/<name>/ for each model")
+    prep.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES))
+    prep.add_argument("--tolerance", type=float, default=1e-5, help="Max allowed |output difference|")
+
+    bench = sub.add_parser("benchmark", help="Compare cold-load time and RSS of .keras and artifacts")
+    bench.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES))
+    bench.add_argument("--runs", type=int, default=3, help="Fresh processes per model and format (median kept)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "prepare":
+        if not prepare(args.models, args.tolerance):
+            sys.exit(1)
+    else:
+        benchmark(args.models, args.runs)
+
+
+if __name__ == "__main__":
+    main()
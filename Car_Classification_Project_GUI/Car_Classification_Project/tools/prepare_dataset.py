@@ -0,0 +1,71 @@
+"""
+Decodes and resizes the Stanford Cars images once per model resolution into
+TFRecord shards, so training and evaluation stop paying for it every epoch.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.prepare_dataset --data-dir path/to/car_data/car_data --out prepared
+    python -m tools.prepare_dataset --data-dir ... --out prepared --models EfficientNetB4 --encoding jpeg
+
+The splits are the notebooks' (train/, and test/ halved per class into val and
+test) and the resize is their nearest-neighbour one. Models sharing an input
+size share one set, written to `<out>/<width>x<height>_<encoding>/<split>`.
+
+--encoding raw (default) stores uint8 pixels: nothing left to decode, but
+384x384 takes about 3.6 GB for the train split. --encoding jpeg recompresses
+at the target size (--quality), roughly 10x smaller for a cheap decode of a
+small image.
+
+The train split is shuffled once (--seed) before it is written, so consecutive
+records mix classes; val and test keep list_splits' order for evaluation. Read
+the shards back with utils.dataset_shards.prepared_dataset for training, or
+`python -m tools.evaluate --shards <out>`.
+"""
+import argparse
+import os
+import random
+import time
+
+from utils.dataset_shards import ENCODINGS, SHARD_SIZE, shard_dir, write_shards
+from utils.model_helper import MODEL_FILES, get_input_size
+from utils.training_data import SPLITS, list_splits
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write pre-resized TFRecord shards of the dataset per resolution.")
+    parser.add_argument("--data-dir", required=True, help="Folder with train/ and test/ class folders")
+    parser.add_argument("--out", required=True, help="Root folder for the shard sets")
+    parser.add_argument("--models", nargs="+", default=sorted(MODEL_FILES), choices=sorted(MODEL_FILES),
+                        help="Write one set per distinct input size of these models")
+    parser.add_argument("--splits", nargs="+", default=list(SPLITS), choices=SPLITS)
+    parser.add_argument("--encoding", choices=ENCODINGS, default="raw")
+    parser.add_argument("--quality", type=int, default=95, help="JPEG quality with --encoding jpeg")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Images per shard file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Decode threads")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the one-off train shuffle")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    class_names, splits = list_splits(args.data_dir)
+    # list_splits is class by class; shard-level shuffling and a bounded shuffle
+    # buffer alone would still feed long single-class runs to training.
+    random.Random(args.seed).shuffle(splits["train"])
+    sizes = {}
+    for name in args.models:
+        sizes.setdefault(tuple(get_input_size(name)), []).append(name)
+
+    for input_size, names in sorted(sizes.items()):
+        print(f"{input_size[0]}x{input_size[1]} ({', '.join(names)})")
+        for split in args.splits:
+            started = time.perf_counter()
+            meta = write_shards(args.data_dir, splits[split], shard_dir(args.out, split, input_size, args.encoding),
+                                input_size, class_names, encoding=args.encoding, quality=args.quality,
+                                shard_size=args.shard_size, workers=args.workers)
+            elapsed = time.perf_counter() - started
+            print(f"    {split}: {meta['count']} images in {elapsed:.1f}s ({meta['count'] / max(elapsed, 1e-9):.0f} img/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Measures how long each page takes to start cold and to rerun, and which heavy
+libraries it pulls in without any user interaction.
+
+Run from the Car_Classification_Project folder:
+
+    python -m tools.startup_benchmark
+    python -m tools.startup_benchmark --baseline HEAD~1     # compare with another revision
+
+Every page runs in a fresh Python process through Streamlit's AppTest, so the
+first run includes all imports (cold start) and the following runs show the
+per-rerun cost. With --baseline the same measurement is repeated on a
+temporary git worktree of that revision.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("tensorflow", "cv2", "plotly", "reportlab", "matplotlib", "onnxruntime")
+
+_MEASURE = """
+import json, statistics, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.run()
+cold = time.perf_counter() - started
+reruns = []
+for _ in range(int(sys.argv[2])):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+print(json.dumps({
+    "cold_s": cold,
+    "rerun_ms": 1000 * statistics.median(reruns) if reruns else None,
+    "heavy_modules": [m for m in sys.argv[3].split(",") if m in sys.modules],
+    "errors": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def app_scripts(project_dir):
+    return [os.path.join(project_dir, "app.py")] + sorted(glob.glob(os.path.join(project_dir, "pages", "*.py")))
+
+
+def measure(project_dir, reruns):
+    results = {}
+    for script in app_scripts(project_dir):
+        proc = subprocess.run([sys.executable, "-c", _MEASURE, script, str(reruns), ",".join(HEAVY_MODULES)],
+                              cwd=project_dir, capture_output=True, text=True)
+        name = os.path.relpath(script, project_dir)
+        try:
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            results[name] = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output"}
+    return results
+
+
+def measure_revision(ref, reruns):
+    """Runs `measure` on a temporary worktree checked out at `ref`."""
+    repo_root = subprocess.check_output(["git", "rev-parse", "--show-toplevel"], cwd=PROJECT_DIR, text=True).strip()
+    prefix = os.path.relpath(PROJECT_DIR, repo_root)
+    worktree = tempfile.mkdtemp(prefix="startup-bench-")
+    try:
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, ref], cwd=repo_root, check=True,
+                       capture_output=True)
+        return measure(os.path.join(worktree, prefix), reruns)
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=repo_root, capture_output=True)
+        shutil.rmtree(worktree, ignore_errors=True)
+
+
+def _format(result):
+    if "error" in result:
+        return f"error: {result['error']}"
+    rerun = f"{result['rerun_ms']:7.0f} ms" if result["rerun_ms"] is not None else "      -"
+    return f"cold {result['cold_s']:6.2f}s | rerun {rerun} | loads {', '.join(result['heavy_modules']) or '-'}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start and rerun timings for the Streamlit pages.")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--baseline", help="Git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--output", help="Write the raw results as JSON")
+    args = parser.parse_args(argv)
+
+    current = measure(PROJECT_DIR, args.reruns)
+    baseline = measure_revision(args.baseline, args.reruns) if args.baseline else None
+
+    for name, result in current.items():
+        print(name)
+        if baseline is not None:
+            print(f"  {args.baseline:<10} {_format(baseline.get(name, {'error': 'missing'}))}")
+        print(f"  {'current':<10} {_format(result)}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"current": current, "baseline": baseline, "baseline_ref": args.baseline}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+import streamlit as st
+
+from utils.metrics import observe
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Served by Streamlit at app/static/ (server.enableStaticServing in .streamlit/config.toml).
+STATIC_DIR = os.path.join(PROJECT_ROOT, "static")
+STATIC_URL = "app/static"
+RENDER_HISTORY = 50
+
+# Process-wide, shared by every session: path -> (mtime, minified text, fingerprint).
+_assets = {}
+_bundles = {}
+_bundle_urls = {}
+_assets_lock = threading.Lock()
+
+# url(...) may itself contain ';' (e.g. Google Fonts weights), so match it as a whole.
+_IMPORT_RE = re.compile(r"""@import\s*(?:url\([^)]*\)|"[^"]*"|'[^']*')[^;]*;""")
+
+_render_stats = {}
+_render_lock = threading.Lock()
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_svg(svg):
+    return re.sub(r">\s+<", "><", svg.strip())
+
+
+def load_asset(rel_path):
+    """
+    Returns `(text, fingerprint)` for a CSS or SVG file under the project folder,
+    minified. The file is read once per process and only re-read if it changes on disk.
+    """
+    path = os.path.join(PROJECT_ROOT, rel_path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _assets.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    text = minify_css(text) if path.endswith(".css") else minify_svg(text)
+    fingerprint = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+    with _assets_lock:
+        _assets[path] = (mtime, text, fingerprint)
+    return text, fingerprint
+
+
+def load_svg(name):
+    return load_asset(os.path.join("ICONS", name))[0]
+
+
+def _bundle_css(rel_paths):
+    """`(bundle_id, css)` for several stylesheets, @imports hoisted to the top; built once per file versions."""
+    assets = [load_asset(p) for p in rel_paths]
+    key = tuple(fingerprint for _, fingerprint in assets)
+    bundle = _bundles.get(key)
+    if bundle is None:
+        imports, rules = [], []
+        for text, _ in assets:
+            imports += _IMPORT_RE.findall(text)
+            rules.append(_IMPORT_RE.sub("", text))
+        bundle_id = hashlib.sha1("".join(key).encode("utf-8")).hexdigest()[:12]
+        bundle = (bundle_id, "".join(dict.fromkeys(imports)) + "".join(rules))
+        with _assets_lock:
+            _bundles[key] = bundle
+    return bundle
+
+
+def css_bundle(*rel_paths):
+    """One inline `<style>` element for several stylesheets, for when static serving is off."""
+    bundle_id, css = _bundle_css(rel_paths)
+    return f'<style data-bundle="{bundle_id}">{css}</style>'
+
+
+def css_bundle_url(*rel_paths):
+    """
+    Writes the bundle once to static/css/, named by its content hash, and returns
+    its URL: the browser fetches and caches it once, and every rerun only sends
+    the short `<link>` to it. Returns None when static/ is not writable.
+    """
+    bundle_id, css = _bundle_css(rel_paths)
+    url = _bundle_urls.get(bundle_id)
+    if url is None:
+        name = f"bundle-{bundle_id}.css"
+        path = os.path.join(STATIC_DIR, "css", name)
+        url = f"{STATIC_URL}/css/{name}"
+        if not os.path.exists(path):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(css)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                # Read-only deployment: remembered as "", so inject_css keeps inlining this bundle.
+                print(f"Could not write {path}, inlining the CSS instead: {e}")
+                url = ""
+        with _assets_lock:
+            _bundle_urls[bundle_id] = url
+    return url or None
+
+
+def inject_css(*rel_paths):
+    try:
+        # Served as text/css by the Streamlit pinned in requirements.txt (older servers sent
+        # text/plain with nosniff, which browsers refuse as a stylesheet).
+        url = css_bundle_url(*rel_paths) if st.get_option("server.enableStaticServing") else None
+        if url:
+            st.markdown(f'<link rel="stylesheet" href="{url}">', unsafe_allow_html=True)
+        else:
+            st.markdown(css_bundle(*rel_paths), unsafe_allow_html=True)
+    except FileNotFoundError as e:
+        st.error(f"CSS file not found: {e.filename}")
+
+
+def record_render_time(page, started):
+    """Records how long a page's script took to render since `started` (perf_counter). Returns ms."""
+    elapsed_ms = 1000 * (time.perf_counter() - started)
+    with _render_lock:
+        stats = _render_stats.setdefault(page, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "recent": []})
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["recent"] = (stats["recent"] + [elapsed_ms])[-RENDER_HISTORY:]
+    observe("page_render", elapsed_ms / 1000, page=page)
+    return elapsed_ms
+
+
+def get_render_stats():
+    """Per page: rerun count, mean, max and median of the recent render times in ms."""
+    with _render_lock:
+        snapshot = {page: dict(stats, recent=list(stats["recent"])) for page, stats in _render_stats.items()}
+    return {
+        page: {
+            "count": stats["count"],
+            "mean_ms": stats["total_ms"] / stats["count"],
+            "max_ms": stats["max_ms"],
+            "recent_median_ms": sorted(stats["recent"])[len(stats["recent"]) // 2],
+        }
+        for page, stats in snapshot.items()
+    }
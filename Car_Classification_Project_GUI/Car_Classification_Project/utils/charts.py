@@ -0,0 +1,55 @@
+import io
+from functools import lru_cache
+
+from utils.metrics import timed
+
+CHART_BG = "#020c1a"
+CHART_TEXT = "#FFFFFF"
+CHART_DIM = "#8899A6"
+NEON_GRADIENT = ["#004488", "#00CCFF"]
+
+
+@lru_cache(maxsize=64)
+@timed("chart")
+def render_bar_chart(labels, values, horizontal=False, value_format="{:.0f}", width_px=820, height_px=350,
+                     dpi=100, gradient=False, color="#00CCFF"):
+    """
+    Renders a dark-theme bar chart to PNG bytes with matplotlib's Agg canvas.
+
+    `labels` and `values` must be tuples so identical charts are served from the cache
+    instead of being rasterized again.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.colors import LinearSegmentedColormap
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi, facecolor=CHART_BG)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, facecolor=CHART_BG)
+
+    if gradient and values:
+        top = max(values) or 1.0
+        neon_scale = LinearSegmentedColormap.from_list("neon", NEON_GRADIENT)
+        bar_colors = [neon_scale(v / top) for v in values]
+    else:
+        bar_colors = color
+
+    positions = range(len(labels))
+    if horizontal:
+        bars = ax.barh(positions, values, color=bar_colors)
+        ax.set_yticks(list(positions), labels)
+        ax.invert_yaxis()
+    else:
+        bars = ax.bar(positions, values, color=bar_colors)
+        ax.set_xticks(list(positions), labels, rotation=30, ha="right")
+
+    ax.bar_label(bars, labels=[value_format.format(v) for v in values], color=CHART_TEXT, padding=3, fontsize=9)
+    ax.margins(x=0.15 if horizontal else 0.02, y=0.02 if horizontal else 0.15)
+    ax.tick_params(colors=CHART_TEXT, labelsize=9)
+    for spine in ax.spines.values():
+        spine.set_color(CHART_DIM)
+    fig.tight_layout()
+
+    out = io.BytesIO()
+    fig.savefig(out, format="png", facecolor=CHART_BG)
+    return out.getvalue()
@@ -0,0 +1,185 @@
+import glob
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from utils.image_sources import bounded_map
+
+ENCODINGS = ("raw", "jpeg")
+SHARD_SIZE = 1024
+META_FILE = "meta.json"
+
+
+def shard_dir(root, split, input_size, encoding="raw"):
+    """`<root>/<width>x<height>_<encoding>/<split>`: one set per resolution, shared by models of that size."""
+    return os.path.join(root, f"{input_size[0]}x{input_size[1]}_{encoding}", split)
+
+
+def _load_resized(path, input_size, encoding, quality):
+    with open(path, "rb") as f:
+        data = f.read()
+    # Nearest-neighbour, as ImageDataGenerator / load_img resized for training.
+    image = Image.open(io.BytesIO(data)).convert("RGB").resize(input_size, Image.NEAREST)
+    if encoding == "jpeg":
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality)
+        pixels = buffer.getvalue()
+    else:
+        pixels = image.tobytes()
+    return pixels, hashlib.sha1(data).hexdigest()
+
+
+def write_shards(data_dir, entries, out_dir, input_size, class_names, encoding="raw", quality=95,
+                 shard_size=SHARD_SIZE, workers=8):
+    """
+    Decodes and resizes every `(relative_path, label)` entry once into TFRecord shards
+    of `shard_size` examples, in entry order. Each example holds the pixels (raw uint8
+    or a JPEG at the target size), the label, the relative path and the sha1 of the
+    source file. meta.json is written last, so a set without it is incomplete.
+    """
+    import tensorflow as tf
+
+    os.makedirs(out_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(out_dir, "*.tfrecord")) + glob.glob(os.path.join(out_dir, META_FILE)):
+        os.remove(stale)
+
+    def feature(value):
+        if isinstance(value, int):
+            return tf.train.Feature(int64_list=tf.train.Int64List(value=[value]))
+        return tf.train.Feature(bytes_list=tf.train.BytesList(value=[value]))
+
+    n_shards = max(1, -(-len(entries) // shard_size))
+    jobs = ((os.path.join(data_dir, rel_path), input_size, encoding, quality) for rel_path, _ in entries)
+    written = 0
+    writer = None
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as pool:
+        for (rel_path, label), (pixels, digest) in zip(entries, bounded_map(pool, _load_resized, jobs, workers * 4)):
+            if written % shard_size == 0:
+                if writer is not None:
+                    writer.close()
+                name = f"{written // shard_size:05d}-of-{n_shards:05d}.tfrecord"
+                writer = tf.io.TFRecordWriter(os.path.join(out_dir, name))
+            example = tf.train.Example(features=tf.train.Features(feature={
+                "image": feature(pixels),
+                "label": feature(int(label)),
+                "key": feature(rel_path.encode("utf-8")),
+                "digest": feature(digest.encode("ascii")),
+            }))
+            writer.write(example.SerializeToString())
+            written += 1
+            if written % 100 == 0:
+                print(f"\r{out_dir}: {written}/{len(entries)}", end="", flush=True)
+    if writer is not None:
+        writer.close()
+
+    meta = {"count": written, "input_size": list(input_size), "encoding": encoding, "quality": quality,
+            "class_names": class_names, "shards": n_shards}
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    print(f"\r{out_dir}: {written} images in {n_shards} shards")
+    return meta
+
+
+def read_meta(directory):
+    path = os.path.join(directory, META_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No complete shard set in {directory}; run `python -m tools.prepare_dataset` first")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_fn(meta):
+    import tensorflow as tf
+
+    width, height = meta["input_size"]
+    spec = {
+        "image": tf.io.FixedLenFeature([], tf.string),
+        "label": tf.io.FixedLenFeature([], tf.int64),
+        "key": tf.io.FixedLenFeature([], tf.string),
+        "digest": tf.io.FixedLenFeature([], tf.string),
+    }
+
+    def parse(record):
+        example = tf.io.parse_single_example(record, spec)
+        if meta["encoding"] == "jpeg":
+            image = tf.io.decode_jpeg(example["image"], channels=3)
+        else:
+            image = tf.io.decode_raw(example["image"], tf.uint8)
+        image = tf.reshape(image, (height, width, 3))
+        return image, example["label"], example["key"], example["digest"]
+
+    return parse
+
+
+def _records(directory, shuffle_files, seed=None):
+    import tensorflow as tf
+
+    files = sorted(glob.glob(os.path.join(directory, "*.tfrecord")))
+    if not files:
+        raise FileNotFoundError(f"No .tfrecord shards in {directory}; run `python -m tools.prepare_dataset` again")
+    ds = tf.data.Dataset.from_tensor_slices(files)
+    if not shuffle_files:
+        # One shard after the other: records come back in the order they were written.
+        return ds.flat_map(tf.data.TFRecordDataset)
+    ds = ds.shuffle(len(files), seed=seed, reshuffle_each_iteration=True)
+    return ds.interleave(tf.data.TFRecordDataset, cycle_length=min(4, len(files)),
+                         num_parallel_calls=tf.data.AUTOTUNE, deterministic=False)
+
+
+def shard_dataset(directory, batch_size=16, training=False, model_name=None, augmentation=None,
+                  shuffle_buffer=2048, seed=None):
+    """
+    Training/validation batches `(images, one_hot_labels)` from a prepared shard set,
+    with the same augmentation and normalisation as utils.training_data.build_dataset
+    but no JPEG decode or resize of the source photos.
+    """
+    import tensorflow as tf
+    from utils.training_data import batch_pipeline
+
+    meta = read_meta(directory)
+    n_classes = len(meta["class_names"])
+    parse = _parse_fn(meta)
+    ds = _records(directory, shuffle_files=training, seed=seed)
+    ds = ds.map(lambda record: _to_training(parse(record), n_classes), num_parallel_calls=tf.data.AUTOTUNE)
+    if training:
+        ds = ds.shuffle(min(shuffle_buffer, meta["count"]), seed=seed, reshuffle_each_iteration=True)
+    return batch_pipeline(ds, batch_size, training, model_name, augmentation)
+
+
+def _to_training(parsed, n_classes):
+    import tensorflow as tf
+
+    image, label, _, _ = parsed
+    return image, tf.one_hot(label, n_classes)
+
+
+def prepared_dataset(root, split, model_name, batch_size=16, encoding="raw", seed=None):
+    """
+    Like utils.training_data.folder_dataset, but read from the shards
+    `python -m tools.prepare_dataset` wrote under `root`. Returns `(dataset, class_names, count)`.
+    """
+    from utils.model_helper import get_input_size
+    from utils.training_data import AUGMENTATION, DEFAULT_AUGMENTATION
+
+    directory = shard_dir(root, split, get_input_size(model_name), encoding)
+    meta = read_meta(directory)
+    training = split == "train"
+    ds = shard_dataset(directory, batch_size, training, model_name=model_name,
+                       augmentation=AUGMENTATION.get(model_name, DEFAULT_AUGMENTATION) if training else None,
+                       seed=seed)
+    return ds, meta["class_names"], meta["count"]
+
+
+def iter_examples(directory):
+    """Yields `(key, digest, label, uint8 pixels)` in the order the set was written, for evaluation."""
+    import tensorflow as tf
+
+    meta = read_meta(directory)
+    ds = _records(directory, shuffle_files=False).map(_parse_fn(meta), num_parallel_calls=tf.data.AUTOTUNE)
+    for image, label, key, digest in ds.prefetch(tf.data.AUTOTUNE).as_numpy_iterator():
+        yield key.decode("utf-8"), digest.decode("ascii"), int(label), np.asarray(image)
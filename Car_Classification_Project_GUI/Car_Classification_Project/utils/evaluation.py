@@ -0,0 +1,115 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from utils.class_names import CAR_CLASSES
+
+# Written by tools.evaluate, shown on the Model Comparison page. Same folder as
+# utils.model_helper.MODELS_DIR, without importing it (and Streamlit) here.
+EVALUATION_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models",
+                               "evaluation.json")
+
+# The models output classes in the order flow_from_directory gave them: the class
+# folder names sorted, as utils.training_data.list_splits lists them. Stanford Cars
+# folders replace the "/" in "Ram C/V Cargo Van Minivan 2012" with "-".
+CLASS_FOLDERS = sorted(name.replace("/", "-") for name in CAR_CLASSES)
+_FOLDER_TO_NAME = {name.replace("/", "-"): name for name in CAR_CLASSES}
+# Display name of each model output.
+CLASS_NAMES = [_FOLDER_TO_NAME[folder] for folder in CLASS_FOLDERS]
+CLASS_INDEX = {folder: i for i, folder in enumerate(CLASS_FOLDERS)}
+CLASS_INDEX.update({name: i for i, name in enumerate(CLASS_NAMES)})
+
+
+def label_for(key):
+    """Class index from the parent folder of an image key, or None when it is not a known class."""
+    parts = key.split("/")
+    return CLASS_INDEX.get(parts[-2]) if len(parts) > 1 else None
+
+
+class ConfusionAccumulator:
+    """
+    Confusion matrix, top-5 hits and inference time of one model, updated batch by batch.
+    Predictions served from a cache are passed without `seconds` and count towards the
+    metrics only; `ms_per_image` can then be given to `summary` instead.
+    """
+
+    def __init__(self, n_classes=len(CLASS_NAMES)):
+        self.confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+        self.top5_hits = 0
+        self.seconds = 0.0
+        self.timed_images = 0
+        self.batch_ms_per_image = []
+
+    def update(self, labels, probs, seconds=None):
+        labels = np.asarray(labels)
+        np.add.at(self.confusion, (labels, probs.argmax(axis=1)), 1)
+        top5 = np.argpartition(probs, -5, axis=1)[:, -5:]
+        self.top5_hits += int((top5 == labels[:, None]).any(axis=1).sum())
+        if seconds is not None:
+            self.seconds += seconds
+            self.timed_images += len(labels)
+            self.batch_ms_per_image.append(1000 * seconds / len(labels))
+
+    def summary(self, ms_per_image=None, class_names=CLASS_NAMES):
+        """
+        Same definitions as sklearn's accuracy and weighted precision/recall, with 0 for empty classes.
+        Per-class results are keyed by `class_names[label]`.
+        """
+        cm = self.confusion
+        total = int(cm.sum())
+        correct = np.diag(cm).astype(np.float64)
+        support = cm.sum(axis=1)
+        predicted = cm.sum(axis=0)
+        recall = np.divide(correct, support, out=np.zeros_like(correct), where=support > 0)
+        precision = np.divide(correct, predicted, out=np.zeros_like(correct), where=predicted > 0)
+        return {
+            "images": total,
+            "accuracy": float(correct.sum() / total) if total else 0.0,
+            "top5_accuracy": self.top5_hits / total if total else 0.0,
+            "precision": float((precision * support).sum() / total) if total else 0.0,
+            "recall": float((recall * support).sum() / total) if total else 0.0,
+            "ms_per_image": 1000 * self.seconds / self.timed_images if self.timed_images else ms_per_image,
+            "p50_batch_ms_per_image": float(np.percentile(self.batch_ms_per_image, 50))
+            if self.batch_ms_per_image else None,
+            "per_class_accuracy": {class_names[i]: float(recall[i]) for i in np.flatnonzero(support)},
+            "support": {class_names[i]: int(support[i]) for i in np.flatnonzero(support)},
+            "confusion_matrix": cm.tolist(),
+        }
+
+
+def largest_classes(confusion, k):
+    """Indices of the `k` classes with the most test images."""
+    return np.argsort(np.asarray(confusion).sum(axis=1), kind="stable")[-k:]
+
+
+def confusion_slice(confusion, classes):
+    """
+    The confusion matrix restricted to `classes`, like the notebook's top-20 view:
+    images of other classes, or predicted as another class, are left out.
+    """
+    classes = np.asarray(classes)
+    return np.asarray(confusion)[np.ix_(classes, classes)]
+
+
+def worst_classes(per_class_accuracy, n=10):
+    """(class name, accuracy) of the `n` least accurate classes."""
+    return sorted(per_class_accuracy.items(), key=lambda item: item[1])[:n]
+
+
+@lru_cache(maxsize=4)
+def _read_evaluation(path, mtime):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read {path}: {e}")
+        return None
+
+
+def load_evaluation(path=EVALUATION_FILE):
+    """The parsed results file, re-read only when it changes on disk; treat it as read-only."""
+    if not os.path.exists(path):
+        return None
+    return _read_evaluation(path, os.path.getmtime(path))
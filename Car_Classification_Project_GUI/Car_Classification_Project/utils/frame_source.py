@@ -0,0 +1,263 @@
+import abc
+import os
+import struct
+import time
+
+import numpy as np
+
+from utils.image_sources import iter_image_entries
+
+# Where the Real-Time page reads frames from: a camera index (default "0"), a
+# recording (.cxrec), a video file, or a folder/ZIP/TAR of images.
+FRAME_SOURCE = os.environ.get("CARXPLAIN_FRAME_SOURCE", "0")
+# Replay speed for recordings, videos and images: 1 = as recorded, 0 = as fast as possible.
+FRAME_SPEED = float(os.environ.get("CARXPLAIN_FRAME_SPEED", "1"))
+# When set, camera sessions on the Real-Time page are recorded into this folder.
+RECORD_DIR = os.environ.get("CARXPLAIN_RECORD_DIR", "")
+
+RECORDING_EXT = ".cxrec"
+RECORDING_MAGIC = b"CXREC1\n"
+# Per frame: seconds since the first frame, then the JPEG size in bytes.
+_FRAME_HEADER = struct.Struct("<dI")
+CAMERA_SIZE = (640, 480)
+CAMERA_FPS = 30
+
+
+class FrameSource(abc.ABC):
+    """
+    The part of cv2.VideoCapture the live loop uses: `read()` returns `(ok, bgr_frame)`,
+    `isOpened()` and `release()`.
+    """
+
+    @abc.abstractmethod
+    def read(self):
+        """Returns `(ok, bgr_frame)`; `(False, None)` once the source is exhausted."""
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class ReplaySource(FrameSource):
+    """
+    A source that replays frames with timestamps, pacing `read()` to `speed` times
+    the original rate, or returning at once when speed is 0; with `loop` it starts
+    over at the end.
+    """
+
+    def __init__(self, speed=1.0, loop=False):
+        self.speed = speed
+        self.loop = loop
+        self._clock_start = None
+
+    def _pace(self, timestamp):
+        if not self.speed:
+            return
+        now = time.perf_counter()
+        if self._clock_start is None or timestamp == 0:
+            self._clock_start = now - timestamp / self.speed
+            return
+        delay = self._clock_start + timestamp / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+    @abc.abstractmethod
+    def _next(self):
+        """Returns `(timestamp, bgr_frame)` or None at the end."""
+
+    @abc.abstractmethod
+    def _rewind(self):
+        """Goes back to the first frame."""
+
+    def read(self):
+        item = self._next()
+        if item is None and self.loop:
+            self._rewind()
+            self._clock_start = None
+            item = self._next()
+        if item is None:
+            return False, None
+        timestamp, frame = item
+        self._pace(timestamp)
+        return True, frame
+
+
+class CameraSource(FrameSource):
+    def __init__(self, index=0):
+        import cv2
+
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_SIZE[0])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_SIZE[1])
+        self.cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def read(self):
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(ReplaySource):
+    def __init__(self, path, speed=1.0, loop=False):
+        import cv2
+
+        super().__init__(speed, loop)
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or CAMERA_FPS
+        self._index = 0
+
+    def _next(self):
+        ok, frame = self.cap.read()
+        if not ok:
+            return None
+        timestamp, self._index = self._index / self.fps, self._index + 1
+        return timestamp, frame
+
+    def _rewind(self):
+        import cv2
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self._index = 0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageFolderSource(ReplaySource):
+    """Every image of a folder or archive as one frame, `fps` frames per second."""
+
+    def __init__(self, source, speed=1.0, loop=False, fps=CAMERA_FPS):
+        super().__init__(speed, loop)
+        self.entries = [read_bytes for _, read_bytes in iter_image_entries(source)]
+        self.fps = fps
+        self._index = 0
+
+    def _next(self):
+        import cv2
+
+        if self._index >= len(self.entries):
+            return None
+        data = self.entries[self._index]()
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        timestamp, self._index = self._index / self.fps, self._index + 1
+        return timestamp, frame
+
+    def _rewind(self):
+        self._index = 0
+
+    def isOpened(self):
+        return bool(self.entries)
+
+
+class RecordingSource(ReplaySource):
+    """Replays a file written by FrameRecorder with its original timing."""
+
+    def __init__(self, path, speed=1.0, loop=False):
+        super().__init__(speed, loop)
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a CarXplain recording")
+
+    def _next(self):
+        import cv2
+
+        header = self._file.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return None
+        timestamp, size = _FRAME_HEADER.unpack(header)
+        data = self._file.read(size)
+        if len(data) < size:  # cut off while recording
+            return None
+        return timestamp, cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def _rewind(self):
+        self._file.seek(len(RECORDING_MAGIC))
+
+    def release(self):
+        self._file.close()
+
+
+class FrameRecorder:
+    """
+    Appends frames to a recording: a short header, then per frame its time offset and
+    a JPEG (about 40 KB for 640x480 at quality 80). A file cut off mid-frame still
+    replays up to that frame.
+    """
+
+    def __init__(self, path, quality=80):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.quality = quality
+        self.frames = 0
+        self._file = open(path, "wb")
+        self._file.write(RECORDING_MAGIC)
+        self._started = None
+
+    def write(self, frame, timestamp=None):
+        import cv2
+
+        now = time.perf_counter() if timestamp is None else timestamp
+        if self._started is None:
+            self._started = now
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("Could not encode frame")
+        self._file.write(_FRAME_HEADER.pack(now - self._started, len(jpeg)))
+        self._file.write(jpeg.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingCamera(FrameSource):
+    """Wraps a source and records every frame it returns."""
+
+    def __init__(self, source, recorder):
+        self.source = source
+        self.recorder = recorder
+
+    def read(self):
+        ok, frame = self.source.read()
+        if ok:
+            self.recorder.write(frame)
+        return ok, frame
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def release(self):
+        self.source.release()
+        self.recorder.close()
+
+
+def open_frame_source(spec=FRAME_SOURCE, speed=FRAME_SPEED, loop=False, fps=CAMERA_FPS):
+    """A FrameSource for a camera index, a .cxrec recording, a video file or an image folder/archive."""
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if not os.path.exists(spec):
+        raise FileNotFoundError(f"Frame source not found: {spec}")
+    if spec.endswith(RECORDING_EXT):
+        return RecordingSource(spec, speed, loop)
+    if os.path.isdir(spec) or not spec.lower().endswith((".mp4", ".avi", ".mov", ".mkv", ".webm")):
+        return ImageFolderSource(spec, speed, loop, fps)
+    return VideoFileSource(spec, speed, loop)
@@ -0,0 +1,81 @@
+import io
+import os
+import tarfile
+import threading
+import zipfile
+from collections import deque
+from functools import partial
+
+from PIL import Image
+
+from utils.metrics import timed
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+_zip_handles = threading.local()
+
+
+def is_image_name(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _read_zip_member(archive_path, member):
+    # ZipFile objects share one file handle, so each decode thread keeps its own.
+    handles = getattr(_zip_handles, "by_path", None)
+    if handles is None:
+        handles = _zip_handles.by_path = {}
+    archive = handles.get(archive_path)
+    if archive is None:
+        archive = handles[archive_path] = zipfile.ZipFile(archive_path)
+    return archive.read(member)
+
+
+def iter_image_entries(source):
+    """
+    Yields `(key, read_bytes)` for every image in a folder, ZIP or TAR archive.
+    Keys are '/'-separated paths relative to the source; `read_bytes()` is safe
+    to call from worker threads. Folders and ZIPs are walked in sorted order,
+    TARs in archive order (members are read sequentially here).
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if is_image_name(name):
+                    full_path = os.path.join(root, name)
+                    key = os.path.relpath(full_path, source).replace(os.sep, "/")
+                    yield key, partial(_read_file, full_path)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(n for n in archive.namelist() if is_image_name(n))
+        for name in names:
+            yield name, partial(_read_zip_member, source, name)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and is_image_name(member.name):
+                    data = archive.extractfile(member).read()
+                    yield member.name, partial(bytes, data)
+    else:
+        raise ValueError(f"Not a folder, ZIP or TAR archive: {source}")
+
+
+@timed("decode")
+def decode_image(data):
+    return Image.open(io.BytesIO(data)).convert("RGB")
+
+
+def bounded_map(pool, fn, items, window):
+    """Like pool.map over `items`, in order, but with at most `window` tasks in flight."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, *item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
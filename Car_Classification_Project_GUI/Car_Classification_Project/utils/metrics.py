@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Process-wide latency histograms and counters, exported when one of these is set:
+#   CARXPLAIN_METRICS_PORT      serve /metrics (Prometheus text) and /metrics.json on localhost
+#   CARXPLAIN_METRICS_FILE      rewrite this JSON file every CARXPLAIN_METRICS_INTERVAL seconds
+METRICS_HOST = os.environ.get("CARXPLAIN_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("CARXPLAIN_METRICS_PORT", "0"))
+METRICS_FILE = os.environ.get("CARXPLAIN_METRICS_FILE", "")
+METRICS_INTERVAL = float(os.environ.get("CARXPLAIN_METRICS_INTERVAL", "30"))
+
+# Upper bounds in seconds, cumulative like Prometheus buckets; the last one is +Inf.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_exporter_started = False
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(stage, seconds, **labels):
+    """Adds one duration in seconds to the histogram of `stage`."""
+    _start_exporter()
+    key = _key(stage, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0}
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+                break
+        hist["count"] += 1
+        hist["sum"] += seconds
+
+
+def count(name, value=1, **labels):
+    _start_exporter()
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+@contextmanager
+def timed(stage, **labels):
+    """
+    Times the block (or, used as a decorator, every call) into the `stage` histogram.
+    Blocks that raise are counted in `errors` with the stage as a label instead.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        count("errors", stage=stage, **labels)
+        raise
+    observe(stage, time.perf_counter() - started, **labels)
+
+
+def _quantile(buckets, total, q):
+    """Linear interpolation inside the bucket holding the q-th observation, as histogram_quantile does."""
+    rank, seen, lower = q * total, 0, 0.0
+    for bound, n in zip(BUCKETS, buckets):
+        if n and seen + n >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - seen) / n
+        seen += n
+        if bound != float("inf"):
+            lower = bound
+    return lower
+
+
+def snapshot():
+    """Current histograms (with p50/p90/p99 estimates in ms) and counters as plain data."""
+    with _lock:
+        histograms = {key: dict(h, buckets=list(h["buckets"])) for key, h in _histograms.items()}
+        counters = dict(_counters)
+    return {
+        "time": time.time(),
+        "stages": [
+            {
+                "stage": name,
+                "labels": dict(labels),
+                "count": h["count"],
+                "mean_ms": 1000 * h["sum"] / h["count"],
+                "p50_ms": 1000 * _quantile(h["buckets"], h["count"], 0.5),
+                "p90_ms": 1000 * _quantile(h["buckets"], h["count"], 0.9),
+                "p99_ms": 1000 * _quantile(h["buckets"], h["count"], 0.99),
+            }
+            for (name, labels), h in sorted(histograms.items())
+        ],
+        "counters": [{"name": name, "labels": dict(labels), "value": value}
+                     for (name, labels), value in sorted(counters.items())],
+    }
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus():
+    with _lock:
+        histograms = {key: dict(h, buckets=list(h["buckets"])) for key, h in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = ["# HELP carxplain_stage_seconds Time spent per processing stage.",
+             "# TYPE carxplain_stage_seconds histogram"]
+    for (name, labels), h in sorted(histograms.items()):
+        labels = (("stage", name),) + labels
+        cumulative = 0
+        for bound, n in zip(BUCKETS, h["buckets"]):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"carxplain_stage_seconds_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"carxplain_stage_seconds_sum{_format_labels(labels)} {h['sum']}")
+        lines.append(f"carxplain_stage_seconds_count{_format_labels(labels)} {h['count']}")
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE carxplain_{name}_total counter")
+        for (counter, labels), value in sorted(counters.items()):
+            if counter == name:
+                lines.append(f"carxplain_{name}_total{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _serve(host, port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = render_prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"Metrics on http://{host}:{port}/metrics")
+
+
+def _dump_periodically(path, interval):
+    def loop():
+        while True:
+            time.sleep(interval)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot(), f, indent=2)
+            os.replace(tmp_path, path)
+
+    threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+
+
+def _start_exporter():
+    global _exporter_started
+    if _exporter_started:
+        return
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    try:
+        if METRICS_PORT:
+            _serve(METRICS_HOST, METRICS_PORT)
+        if METRICS_FILE:
+            _dump_periodically(METRICS_FILE, METRICS_INTERVAL)
+    except OSError as e:
+        print(f"Metrics exporter not started: {e}")
@@ -1,122 +1,668 @@
-import tensorflow as tf
-import numpy as np
-import cv2
-import streamlit as st
-from tensorflow.keras.applications.inception_v3 import preprocess_input as preprocess_inception
-from tensorflow.keras.applications.resnet50 import preprocess_input as preprocess_resnet
-from tensorflow.keras.applications.efficientnet import preprocess_input as preprocess_efficientnet
-
-
-@st.cache_resource
-def load_custom_model(model_path):
-    """..."""
-    try:
-        model = tf.keras.models.load_model(model_path)
-        return model
-    except Exception as e:
-        st.error(f"Error loading model from {model_path}: {e}")
-        return None
-
-
-def smart_preprocess(image, model_name):
-    """
-    ...
-    """
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-
-
-    if "InceptionV3" in model_name:
-        target_size = (299, 299)
-        preprocessor = preprocess_inception
-    elif "ResNet50" in model_name:
-        target_size = (224, 224)
-        preprocessor = preprocess_resnet
-    elif "EfficientNetB4" in model_name:
-        target_size = (384, 384)
-        preprocessor = preprocess_efficientnet
-    else:
-        target_size = (224, 224)
-        preprocessor = preprocess_resnet
-
-    img = image.resize(target_size)
-    img_array = tf.keras.preprocessing.image.img_to_array(img)
-    img_array = np.expand_dims(img_array, axis=0)
-    img_array = preprocessor(img_array)
-
-    return img_array
-
-
-def get_last_conv_layer(model):
-    """Convolution"""
-    for layer in reversed(model.layers):
-        try:
-
-            if hasattr(layer, 'output_shape'):
-                output_shape = layer.output_shape
-            elif hasattr(layer, 'output'):
-                output_shape = layer.output.shape
-            else:
-                continue
-
-
-            if isinstance(output_shape, tuple) and len(output_shape) == 4:
-                return layer.name
-
-        except (AttributeError, ValueError):
-            continue
-
-    return None
-
-
-def make_gradcam_heatmap(img_array, model, last_conv_layer_name, pred_index=None):
-    """(Heatmap)"""
-
-
-    inputs = model.inputs
-
-    grad_model = tf.keras.models.Model(
-        inputs=inputs,
-        outputs=[model.get_layer(last_conv_layer_name).output, model.output]
-    )
-
-    with tf.GradientTape() as tape:
-        last_conv_layer_output, preds = grad_model(img_array)
-
-
-        if isinstance(preds, list):
-            preds = preds[0]
-
-        if pred_index is None:
-            pred_index = tf.argmax(preds[0])
-        class_channel = preds[:, pred_index]
-
-    grads = tape.gradient(class_channel, last_conv_layer_output)
-
-
-    if grads is None:
-        raise ValueError("Gradient calculation failed. The layer might be disconnected.")
-
-    pooled_grads = tf.reduce_mean(grads, axis=(0, 1, 2))
-
-    last_conv_layer_output = last_conv_layer_output[0]
-
-
-    heatmap = last_conv_layer_output @ pooled_grads[..., tf.newaxis]
-    heatmap = tf.squeeze(heatmap)
-
-    heatmap = tf.maximum(heatmap, 0) / tf.math.reduce_max(heatmap)
-    return heatmap.numpy()
-
-
-def overlay_heatmap(heatmap, original_img, alpha=0.4):
-    """..."""
-    heatmap = np.uint8(255 * heatmap)
-    jet = cv2.applyColorMap(heatmap, cv2.COLORMAP_JET)
-    jet = cv2.cvtColor(jet, cv2.COLOR_BGR2RGB)
-
-    original_img = np.array(original_img)
-    jet = cv2.resize(jet, (original_img.shape[1], original_img.shape[0]))
-
-    superimposed_img = jet * alpha + original_img * (1 - alpha)
+import json
+import os
+import threading
+import time
+import weakref
+import numpy as np
+import streamlit as st
+
+from utils.metrics import timed
+
+# TensorFlow and OpenCV are imported inside the functions that need them: importing
+# TensorFlow costs seconds, and pages that never run a Keras model should not pay it.
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
+MODEL_FILES = {
+    "InceptionV3": "1-inceptionv3-training-code.keras",
+    "ResNet50": "resnet50_best.keras",
+    "EfficientNetB4": "efficientnetb4_best_model.keras",
+}
+
+# Written by tools.distill; only offered in the UI once it has been trained.
+STUDENT_MODEL_FILE = "student_model.keras"
+STUDENT_INFO_FILE = "student_model.json"
+
+
+# Inference backend for load_custom_model: "keras", or "onnx" for models exported by
+# tools.export_onnx (needs onnxruntime; falls back to Keras when either is missing).
+ONNX_DIR = os.path.join(MODELS_DIR, "onnx")
+MODEL_BACKEND = os.environ.get("CARXPLAIN_BACKEND", "keras").lower()
+ORT_INTRA_OP_THREADS = int(os.environ.get("CARXPLAIN_ORT_THREADS", "0"))
+ORT_OPTIMIZATION_LEVEL = os.environ.get("CARXPLAIN_ORT_OPT_LEVEL", "all").lower()
+
+
+def onnx_path_for(model_path):
+    return os.path.join(ONNX_DIR, os.path.splitext(os.path.basename(model_path))[0] + ".onnx")
+
+
+class OnnxModel:
+    """
+    An exported model run by ONNX Runtime on CPU, behind the part of the Keras model API
+    the app uses: predict, predict_on_batch and calling the model. It has no layers, so
+    Grad-CAM is skipped and callers fall back to plain prediction.
+
+    `initializers` maps initializer names to arrays the session uses in place of the
+    weights stored in the file, without copying them (e.g. views of shared memory).
+    """
+
+    layers = ()
+
+    def __init__(self, path, intra_op_threads=0, optimization_level="all", initializers=None):
+        import onnxruntime as ort
+
+        levels = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = levels[optimization_level]
+        self._initializers = []
+        if initializers:
+            # Pre-packing would give every session its own re-laid-out copy of the weights.
+            options.add_session_config_entry("session.disable_prepacking", "1")
+            for name, array in initializers.items():
+                value = ort.OrtValue.ortvalue_from_numpy(array)
+                options.add_initializer(name, value)
+                self._initializers.append(value)
+        self._session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_name = self._session.get_inputs()[0].name
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.path = path
+
+    def predict_on_batch(self, x):
+        return self._session.run(None, {self._input_name: np.asarray(x, dtype=np.float32)})[0]
+
+    def predict(self, x, batch_size=32, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        return np.concatenate([self.predict_on_batch(x[i:i + batch_size]) for i in range(0, len(x), batch_size)])
+
+    def __call__(self, x, training=False):
+        return self.predict_on_batch(x)
+
+
+def _load_onnx_model(model_path):
+    onnx_path = onnx_path_for(model_path)
+    if not os.path.exists(onnx_path):
+        print(f"No ONNX export at {onnx_path}, using Keras. Run `python -m tools.export_onnx` first.")
+        return None
+    try:
+        return OnnxModel(onnx_path, ORT_INTRA_OP_THREADS, ORT_OPTIMIZATION_LEVEL)
+    except Exception as e:
+        print(f"ONNX Runtime unavailable for {onnx_path} ({e}), using Keras.")
+        return None
+
+
+# Written by tools.prepare_artifacts: the architecture as JSON and every weight in one
+# flat file that is memory-mapped at load, instead of unpacking the .keras archive.
+ARTIFACTS_DIR = os.path.join(MODELS_DIR, "fast")
+ARTIFACT_ALIGNMENT = 64
+
+
+def artifact_dir_for(model_path):
+    return os.path.join(ARTIFACTS_DIR, os.path.splitext(os.path.basename(model_path))[0])
+
+
+def save_model_artifact(model, model_path, output_dir=None):
+    """Writes `model` as model.json + weights.bin into the artifact folder of `model_path`."""
+    import tensorflow as tf
+
+    output_dir = output_dir or artifact_dir_for(model_path)
+    os.makedirs(output_dir, exist_ok=True)
+    tensors, offset = [], 0
+    with open(os.path.join(output_dir, "weights.bin"), "wb") as f:
+        for weight in model.get_weights():
+            weight = np.ascontiguousarray(weight)
+            padding = -offset % ARTIFACT_ALIGNMENT
+            f.write(b"\0" * padding)
+            offset += padding
+            tensors.append({"dtype": weight.dtype.str, "shape": list(weight.shape), "offset": offset})
+            f.write(weight.tobytes())
+            offset += weight.nbytes
+    manifest = {
+        "source": os.path.basename(model_path),
+        "source_size": os.path.getsize(model_path),
+        "tensorflow": tf.__version__,
+        "model": json.loads(model.to_json()),
+        "weights": tensors,
+    }
+    # Written last: a folder without model.json is never picked up half-written.
+    with open(os.path.join(output_dir, "model.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return output_dir
+
+
+def load_model_artifact(model_path):
+    """
+    Rebuilds the model from its prepared artifact, or returns None when there is none
+    or the .keras file changed since it was prepared. The weights are views into a
+    read-only memory map, so nothing is decompressed or copied before set_weights.
+    """
+    folder = artifact_dir_for(model_path)
+    manifest_path = os.path.join(folder, "model.json")
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if os.path.exists(model_path) and (os.path.getsize(model_path) != manifest["source_size"]
+                                       or os.path.getmtime(model_path) > os.path.getmtime(manifest_path)):
+        print(f"{folder} is older than {model_path}, loading the .keras file. "
+              f"Run `python -m tools.prepare_artifacts prepare` again.")
+        return None
+
+    import tensorflow as tf
+    model = tf.keras.models.model_from_json(json.dumps(manifest["model"]))
+    blob = np.memmap(os.path.join(folder, "weights.bin"), dtype=np.uint8, mode="r")
+    model.set_weights([np.ndarray(t["shape"], dtype=np.dtype(t["dtype"]), buffer=blob, offset=t["offset"])
+                       for t in manifest["weights"]])
+    return model
+
+
+@st.cache_resource
+def load_custom_model(model_path, fold_batchnorm=True, backend=None):
+    """..."""
+    if (backend or MODEL_BACKEND) == "onnx":
+        model = _load_onnx_model(model_path)
+        if model is not None:
+            return model
+    import tensorflow as tf
+    model = None
+    try:
+        model = load_model_artifact(model_path)
+    except Exception as e:
+        print(f"Prepared artifact for {model_path} unusable ({e}), loading the .keras file.")
+    if model is None:
+        try:
+            # The app never trains, so the optimizer state stored in the archive is not restored.
+            model = tf.keras.models.load_model(model_path, compile=False)
+        except Exception as e:
+            st.error(f"Error loading model from {model_path}: {e}")
+            return None
+    if fold_batchnorm:
+        try:
+            model = fold_head_batchnorm(model)
+        except Exception as e:
+            print(f"BatchNorm folding skipped for {model_path}: {e}")
+    return model
+
+
+def _head_layers(model):
+    """Layers after the last GlobalAveragePooling2D, or None if the head is not a plain chain."""
+    import tensorflow as tf
+    pools = [i for i, layer in enumerate(model.layers)
+             if isinstance(layer, tf.keras.layers.GlobalAveragePooling2D)]
+    if not pools:
+        return None, None
+    head = model.layers[pools[-1] + 1:]
+    allowed = (tf.keras.layers.BatchNormalization, tf.keras.layers.Dense, tf.keras.layers.Dropout,
+               tf.keras.layers.Activation)
+    if not head or not all(isinstance(layer, allowed) for layer in head):
+        return None, None
+    return model.layers[pools[-1]], head
+
+
+def _batchnorm_affine(layer):
+    """Inference-time BatchNormalization as `x * scale + shift`."""
+    weights = layer.get_weights()
+    gamma = weights.pop(0) if layer.scale else 1.0
+    beta = weights.pop(0) if layer.center else 0.0
+    mean, variance = weights
+    scale = gamma / np.sqrt(variance + layer.epsilon)
+    return scale, beta - mean * scale
+
+
+def fold_head_batchnorm(model, atol=1e-4):
+    """
+    Folds each BatchNormalization of the classification head into the Dense layer that
+    follows it and drops Dropout, so the head runs as plain Dense layers at inference.
+    The folded head is checked against the original on random features; if anything
+    does not fit (a BN with no Dense after it, a non-chain head, a mismatch) the original
+    model is returned unchanged.
+    """
+    import tensorflow as tf
+
+    pool, head = _head_layers(model)
+    if head is None or not any(isinstance(layer, tf.keras.layers.BatchNormalization) for layer in head):
+        return model
+
+    folded, pending = [], None
+    for layer in head:
+        if isinstance(layer, tf.keras.layers.Dropout):
+            continue
+        if isinstance(layer, tf.keras.layers.BatchNormalization):
+            scale, shift = _batchnorm_affine(layer)
+            pending = (scale, shift) if pending is None else (pending[0] * scale, pending[1] * scale + shift)
+        elif isinstance(layer, tf.keras.layers.Dense):
+            kernel, *bias = layer.get_weights()
+            bias = bias[0] if bias else np.zeros(kernel.shape[1], dtype=kernel.dtype)
+            if pending is not None:
+                bias = bias + pending[1] @ kernel
+                kernel = pending[0][:, None] * kernel
+                pending = None
+            folded.append((layer, kernel.astype(np.float32), bias.astype(np.float32)))
+        elif pending is not None:
+            return model  # an activation between BN and Dense cannot be folded through
+        else:
+            folded.append((layer, None, None))
+    if pending is not None:
+        return model
+
+    x = pool.output
+    new_layers = []
+    for layer, kernel, bias in folded:
+        if kernel is None:
+            new_layer = tf.keras.layers.Activation(layer.activation, name=f"{layer.name}_folded")
+        else:
+            new_layer = tf.keras.layers.Dense(kernel.shape[1], activation=layer.activation,
+                                              name=f"{layer.name}_folded")
+        x = new_layer(x)
+        if kernel is not None:
+            new_layer.set_weights([kernel, bias])
+        new_layers.append(new_layer)
+
+    # Features drawn around the first BN's running statistics exercise the realistic range.
+    first_bn = next(layer for layer in head if isinstance(layer, tf.keras.layers.BatchNormalization))
+    mean, variance = first_bn.get_weights()[-2:]
+    features = (mean + np.sqrt(variance) * np.random.default_rng(0).standard_normal((8, mean.size))).astype(np.float32)
+    expected, actual = features, features
+    for layer in head:
+        expected = layer(expected, training=False)
+    for layer in new_layers:
+        actual = layer(actual)
+    max_diff = float(np.max(np.abs(np.asarray(expected) - np.asarray(actual))))
+    if max_diff > atol:
+        print(f"BatchNorm folding rejected for {model.name}: max difference {max_diff:.2e}")
+        return model
+
+    return tf.keras.Model(model.inputs, x, name=model.name)
+
+
+def load_student_info():
+    """
+    Returns the metrics tools.distill saved next to the student model
+    (arch, top-1 accuracy, accuracy gap, CPU latency), or None if there is no student.
+    """
+    if not os.path.exists(os.path.join(MODELS_DIR, STUDENT_MODEL_FILE)):
+        return None
+    try:
+        with open(os.path.join(MODELS_DIR, STUDENT_INFO_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Input size and normalisation mode of each architecture.
+# "tf" scales to [-1, 1], "caffe" is BGR mean subtraction, "passthrough" keeps 0-255.
+PREPROCESS_SPECS = {
+    "InceptionV3": ((299, 299), "tf"),
+    "ResNet50": ((224, 224), "caffe"),
+    "EfficientNetB4": ((384, 384), "passthrough"),
+    "MobileNetV3": ((224, 224), "passthrough"),
+    "EfficientNetB0": ((224, 224), "passthrough"),
+}
+
+# tf.keras.applications module whose preprocess_input implements each mode.
+_KERAS_PREPROCESSORS = {
+    "tf": "inception_v3",
+    "caffe": "resnet50",
+    "passthrough": "efficientnet",
+}
+
+_CAFFE_MEAN_BGR = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+_input_buffers = threading.local()
+
+_grad_models = weakref.WeakKeyDictionary()
+_grad_models_lock = threading.Lock()
+
+
+def _resolve_spec(model_name):
+    for arch, spec in PREPROCESS_SPECS.items():
+        if arch in model_name:
+            return spec
+    return PREPROCESS_SPECS["ResNet50"]
+
+
+def get_input_size(model_name):
+    return _resolve_spec(model_name)[0]
+
+
+def get_keras_preprocessor(model_name):
+    """The Keras `preprocess_input` for `model_name`, e.g. as an ImageDataGenerator preprocessing_function."""
+    import tensorflow as tf
+
+    return getattr(tf.keras.applications, _KERAS_PREPROCESSORS[_resolve_spec(model_name)[1]]).preprocess_input
+
+
+def smart_preprocess(image, model_name):
+    """
+    ...
+    """
+    with timed("preprocess", model=model_name):
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        target_size, mode = _resolve_spec(model_name)
+
+        img = np.asarray(image.resize(target_size))
+        img_array = np.empty((1, target_size[1], target_size[0], 3), dtype=np.float32)
+        _normalize_into(img, img_array[0], mode)
+
+    return img_array
+
+
+def _get_input_buffer(model_name, target_size):
+    buffers = getattr(_input_buffers, "by_model", None)
+    if buffers is None:
+        buffers = _input_buffers.by_model = {}
+
+    shape = (1, target_size[1], target_size[0], 3)
+    buffer = buffers.get(model_name)
+    if buffer is None or buffer.shape != shape:
+        buffer = np.empty(shape, dtype=np.float32)
+        buffers[model_name] = buffer
+    return buffer
+
+
+def _normalize_into(pixels, out, mode):
+    """Same maths as the Keras preprocess_input functions, written in place into `out`."""
+    if mode == "caffe":
+        out[...] = pixels[..., ::-1]
+        out -= _CAFFE_MEAN_BGR
+    elif mode == "tf":
+        out[...] = pixels
+        out /= 127.5
+        out -= 1.0
+    else:
+        out[...] = pixels
+    return out
+
+
+def resize_pyramid(image, model_names):
+    """
+    Resizes the image once per distinct input size, largest first, each level
+    derived from the previous one (384 -> 299 -> 224) so only the first resize
+    touches the full-resolution pixels. Returns uint8 arrays keyed by model name.
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    sizes_by_model = {name: get_input_size(name) for name in model_names}
+    sizes = sorted(set(sizes_by_model.values()), key=lambda s: s[0] * s[1], reverse=True)
+
+    pyramid = {}
+    level = image
+    for size in sizes:
+        level = level.resize(size)
+        pyramid[size] = np.asarray(level)
+
+    return {name: pyramid[size] for name, size in sizes_by_model.items()}
+
+
+def preprocess_for_models(image, model_names):
+    """
+    Prepares one input batch per model from a single decoded image.
+
+    Uses resize_pyramid, then writes each architecture's normalisation into a
+    preallocated per-thread buffer, which is reused by the next call on the
+    same thread: consume the arrays before preprocessing again.
+    """
+    with timed("preprocess", model="cascade"):
+        pixels = resize_pyramid(image, model_names)
+
+        batches = {}
+        for name, level in pixels.items():
+            size, mode = _resolve_spec(name)
+            buffer = _get_input_buffer(name, size)
+            _normalize_into(level, buffer[0], mode)
+            batches[name] = buffer
+    return batches
+
+
+def preprocess_batch(images, model_name):
+    """
+    Stacks several images into one normalised batch for `model_name`.
+    Accepts PIL images or uint8 arrays already resized to the model's input size.
+    """
+    target_size, mode = _resolve_spec(model_name)
+    with timed("preprocess", model=model_name):
+        batch = np.empty((len(images), target_size[1], target_size[0], 3), dtype=np.float32)
+        for i, image in enumerate(images):
+            if not isinstance(image, np.ndarray):
+                if image.mode != "RGB":
+                    image = image.convert("RGB")
+                image = np.asarray(image.resize(target_size))
+            _normalize_into(image, batch[i], mode)
+    return batch
+
+
+# Cheapest model first; later stages only see the images earlier ones were unsure about.
+CASCADE_ORDER = ("ResNet50", "InceptionV3", "EfficientNetB4")
+CASCADE_MIN_CONFIDENCE = 0.6
+CASCADE_MIN_MARGIN = 0.2
+
+
+def _confident_mask(probs, min_confidence, min_margin):
+    top2 = np.sort(probs, axis=1)[:, -2:]
+    return (top2[:, 1] >= min_confidence) & (top2[:, 1] - top2[:, 0] >= min_margin)
+
+
+def cascade_predict_batch(pixels_by_model, models, min_confidence=CASCADE_MIN_CONFIDENCE,
+                          min_margin=CASCADE_MIN_MARGIN, order=CASCADE_ORDER):
+    """
+    Confidence-gated cascade over a batch.
+
+    `pixels_by_model` maps architecture name -> list of images (uint8 arrays at
+    that model's input size or PIL images) and `models` maps name -> loaded
+    model; stages missing from either are skipped. An image is escalated to the
+    next stage while its top-1 probability is below `min_confidence` or its
+    top-1/top-2 margin is below `min_margin`; the last stage always answers.
+
+    Returns (probs, answered_by, stage_times) where answered_by names the stage
+    that produced each row and stage_times holds seconds spent per stage.
+    """
+    stages = [name for name in order if models.get(name) is not None and name in pixels_by_model]
+    if not stages:
+        raise ValueError("No cascade stage has both a model and inputs")
+
+    count = len(pixels_by_model[stages[0]])
+    probs = None
+    answered_by = [None] * count
+    stage_times = {}
+    pending = np.arange(count)
+
+    for i, name in enumerate(stages):
+        batch = preprocess_batch([pixels_by_model[name][j] for j in pending], name)
+        start = time.perf_counter()
+        with timed("inference", model=name):
+            out = np.asarray(models[name].predict_on_batch(batch))
+        stage_times[name] = time.perf_counter() - start
+
+        if probs is None:
+            probs = np.empty((count, out.shape[1]), dtype=np.float32)
+        probs[pending] = out
+
+        if i == len(stages) - 1:
+            confident = np.ones(len(pending), dtype=bool)
+        else:
+            confident = _confident_mask(out, min_confidence, min_margin)
+        for j in pending[confident]:
+            answered_by[j] = name
+        pending = pending[~confident]
+        if not len(pending):
+            break
+
+    return probs, answered_by, stage_times
+
+
+def cascade_predict(image, models, min_confidence=CASCADE_MIN_CONFIDENCE, min_margin=CASCADE_MIN_MARGIN,
+                    explain=False):
+    """
+    Single-image cascade. Returns (preds, info) with preds shaped like
+    model.predict output and info holding the answering `model_name`, the
+    `stages` run and per-stage `stage_times`. With `explain=True`, info["heatmap"]
+    is the Grad-CAM of the answering model only. Each stage still runs once:
+    its forward pass goes through the Grad-CAM model under the gradient tape,
+    and the gradients are computed only when that stage answers.
+    """
+    stages = [name for name in CASCADE_ORDER if models.get(name) is not None]
+    if not stages:
+        raise ValueError("No cascade model is loaded")
+
+    inputs = preprocess_for_models(image, stages)
+    stage_times = {}
+    heatmap = None
+
+    for i, name in enumerate(stages):
+        model = models[name]
+        last = i == len(stages) - 1
+        answers = (lambda p: True) if last else (lambda p: _confident_mask(p, min_confidence, min_margin)[0])
+        start = time.perf_counter()
+        preds = None
+        if explain:
+            preds, heatmap = _try_gradcam(inputs[name], model, explain_if=answers, model_name=name)
+        if preds is None:
+            with timed("inference", model=name):
+                preds = np.asarray(model.predict_on_batch(inputs[name]))
+        stage_times[name] = time.perf_counter() - start
+
+        if answers(preds):
+            break
+
+    info = {"model_name": name, "stages": list(stage_times), "stage_times": stage_times, "heatmap": heatmap}
+    return preds, info
+
+
+def _try_gradcam(img_array, model, explain_if=None, model_name=None):
+    """(preds, heatmap) from the Grad-CAM pass, or (None, None) when the model has no usable conv layer."""
+    last_conv = get_last_conv_layer(model)
+    if not last_conv:
+        return None, None
+    try:
+        return _gradcam_forward(img_array, model, last_conv, explain_if=explain_if, model_name=model_name)
+    except ValueError:
+        return None, None
+
+
+def get_last_conv_layer(model):
+    """Convolution"""
+    for layer in reversed(model.layers):
+        try:
+
+            if hasattr(layer, 'output_shape'):
+                output_shape = layer.output_shape
+            elif hasattr(layer, 'output'):
+                output_shape = layer.output.shape
+            else:
+                continue
+
+
+            if isinstance(output_shape, tuple) and len(output_shape) == 4:
+                return layer.name
+
+        except (AttributeError, ValueError):
+            continue
+
+    return None
+
+
+def _get_grad_model(model, last_conv_layer_name):
+    """Builds the (conv activations, predictions) model once per loaded model and layer."""
+    import tensorflow as tf
+
+    with _grad_models_lock:
+        per_model = _grad_models.setdefault(model, {})
+        grad_model = per_model.get(last_conv_layer_name)
+        if grad_model is None:
+            grad_model = tf.keras.models.Model(
+                inputs=model.inputs,
+                outputs=[model.get_layer(last_conv_layer_name).output, model.output]
+            )
+            per_model[last_conv_layer_name] = grad_model
+    return grad_model
+
+
+def _gradcam_forward(img_array, model, last_conv_layer_name, pred_index=None, explain_if=None, model_name=None):
+    """
+    (preds, heatmap); the heatmap is None, and no gradient is taken, when `explain_if(preds)`
+    is false. The forward pass is this call's model inference, so it is recorded as the
+    "inference" stage and the whole call as "gradcam", both labelled with `model_name`.
+    """
+    labels = {"model": model_name} if model_name else {}
+    with timed("gradcam", **labels):
+        return _gradcam_pass(img_array, model, last_conv_layer_name, pred_index, explain_if, labels)
+
+
+def _gradcam_pass(img_array, model, last_conv_layer_name, pred_index, explain_if, labels):
+    import tensorflow as tf
+
+    grad_model = _get_grad_model(model, last_conv_layer_name)
+
+    with tf.GradientTape() as tape:
+        with timed("inference", **labels):
+            last_conv_layer_output, preds = grad_model(img_array, training=False)
+
+
+        if isinstance(preds, list):
+            preds = preds[0]
+
+        if pred_index is None:
+            pred_index = tf.argmax(preds[0])
+        class_channel = preds[:, pred_index]
+
+    if explain_if is not None and not explain_if(preds.numpy()):
+        return preds.numpy(), None
+
+    grads = tape.gradient(class_channel, last_conv_layer_output)
+
+
+    if grads is None:
+        raise ValueError("Gradient calculation failed. The layer might be disconnected.")
+
+    pooled_grads = tf.reduce_mean(grads, axis=(0, 1, 2))
+
+    last_conv_layer_output = last_conv_layer_output[0]
+
+
+    heatmap = last_conv_layer_output @ pooled_grads[..., tf.newaxis]
+    heatmap = tf.squeeze(heatmap)
+
+    heatmap = tf.maximum(heatmap, 0) / tf.math.reduce_max(heatmap)
+    return preds.numpy(), heatmap.numpy()
+
+
+def make_gradcam_heatmap(img_array, model, last_conv_layer_name, pred_index=None):
+    """(Heatmap)"""
+    _, heatmap = _gradcam_forward(img_array, model, last_conv_layer_name, pred_index)
+    return heatmap
+
+
+def predict_with_gradcam(img_array, model, last_conv_layer_name, top_k=3, model_name=None):
+    """
+    Prediction and explanation from a single forward pass: the probabilities
+    recorded under the gradient tape are returned instead of calling
+    model.predict separately. Returns (preds, top_k_indices, heatmap).
+    `model_name` labels the pass in the metrics.
+    """
+    preds, heatmap = _gradcam_forward(img_array, model, last_conv_layer_name, model_name=model_name)
+    top_indices = preds[0].argsort()[-top_k:][::-1]
+    return preds, top_indices, heatmap
+
+
+@timed("overlay")
+def overlay_heatmap(heatmap, original_img, alpha=0.4):
+    """..."""
+    import cv2
+
+    heatmap = np.uint8(255 * heatmap)
+    jet = cv2.applyColorMap(heatmap, cv2.COLORMAP_JET)
+    jet = cv2.cvtColor(jet, cv2.COLOR_BGR2RGB)
+
+    original_img = np.array(original_img)
+    jet = cv2.resize(jet, (original_img.shape[1], original_img.shape[0]))
+
+    superimposed_img = jet * alpha + original_img * (1 - alpha)
     return np.uint8(superimposed_img)
\ No newline at end of file
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from utils.class_names import CAR_CLASSES
+from utils.model_helper import MODELS_DIR
+
+PREDICTIONS_DIR = os.path.join(MODELS_DIR, "predictions")
+PROBS_DTYPE = np.float16
+
+_checkpoint_hashes = {}
+
+
+def file_digest(path, algorithm="sha256"):
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def checkpoint_hash(model_path):
+    """Content hash of a model file, remembered per (path, size, mtime) for the life of the process."""
+    stat = os.stat(model_path)
+    key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime)
+    if key not in _checkpoint_hashes:
+        _checkpoint_hashes[key] = file_digest(model_path)
+    return _checkpoint_hashes[key]
+
+
+def image_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _replace(path, data):
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+class PredictionStore:
+    """
+    Probabilities of one model checkpoint per image, kept on disk so evaluations only
+    run the images (or checkpoints) they have not seen yet.
+
+    Each checkpoint gets a folder under models/predictions named after the model and
+    its content hash, holding `probs.f16` (one float16 row per prediction, appended),
+    `index.jsonl` (image key, image hash and row) and `timing.json`. A changed image
+    gets a new row; the latest row per key wins and `compact()` drops the stale ones.
+
+        store = PredictionStore("ResNet50", model_path)
+        probs = store.get(key, digest)          # None when not cached
+        store.add(keys, digests, probs)
+        store.close()
+    """
+
+    def __init__(self, model_name, model_path, variant=None, root=PREDICTIONS_DIR, n_classes=len(CAR_CLASSES)):
+        self.model_name = model_name
+        self.checkpoint = checkpoint_hash(model_path)
+        self.n_classes = n_classes
+        # `variant` separates predictions made with different preprocessing of the same checkpoint.
+        folder = f"{model_name}-{self.checkpoint[:16]}" + (f"-{variant}" if variant else "")
+        self.path = os.path.join(root, folder)
+        self._probs_path = os.path.join(self.path, "probs.f16")
+        self._index_path = os.path.join(self.path, "index.jsonl")
+        self._timing_path = os.path.join(self.path, "timing.json")
+        self._lock = threading.Lock()
+        self._index = {}  # key -> (image digest, row)
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+        self._probs_file = open(self._probs_path, "ab")
+        self._index_file = open(self._index_path, "a", encoding="utf-8")
+        self.timing = {"images": 0, "seconds": 0.0}
+        if os.path.exists(self._timing_path):
+            with open(self._timing_path, "r", encoding="utf-8") as f:
+                self.timing = json.load(f)
+
+    def _load(self):
+        row_bytes = self.n_classes * np.dtype(PROBS_DTYPE).itemsize
+        rows = os.path.getsize(self._probs_path) // row_bytes if os.path.exists(self._probs_path) else 0
+        if rows and os.path.getsize(self._probs_path) != rows * row_bytes:
+            # Cut off mid-row by an interrupted run: drop the partial row so appends stay aligned.
+            with open(self._probs_path, "r+b") as f:
+                f.truncate(rows * row_bytes)
+        self._rows = rows
+        self._map()
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # partial last line
+                    if entry["row"] < rows:
+                        self._index[entry["key"]] = (entry["digest"], entry["row"])
+
+    def _map(self):
+        self._probs = np.memmap(self._probs_path, dtype=PROBS_DTYPE, mode="r", shape=(self._rows, self.n_classes)) \
+            if self._rows else np.empty((0, self.n_classes), dtype=PROBS_DTYPE)
+
+    def _row(self, row):
+        if row >= len(self._probs):  # appended since the file was mapped
+            self._map()
+        return self._probs[row]
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, key, digest):
+        """Cached float16 probabilities for `key`, or None when missing or the image changed."""
+        entry = self._index.get(key)
+        if entry is None or entry[0] != digest:
+            return None
+        return self._row(entry[1])
+
+    def add(self, keys, digests, probs):
+        probs = np.asarray(probs, dtype=PROBS_DTYPE).reshape(len(keys), self.n_classes)
+        with self._lock:
+            self._probs_file.write(probs.tobytes())
+            self._probs_file.flush()
+            lines = []
+            for key, digest in zip(keys, digests):
+                self._index[key] = (digest, self._rows)
+                lines.append(json.dumps({"key": key, "digest": digest, "row": self._rows}) + "\n")
+                self._rows += 1
+            self._index_file.write("".join(lines))
+            self._index_file.flush()
+
+    def record_time(self, images, seconds):
+        """Adds inference time, so cached evaluations can still report the model's speed."""
+        self.timing["images"] += images
+        self.timing["seconds"] += seconds
+
+    @property
+    def ms_per_image(self):
+        return 1000 * self.timing["seconds"] / self.timing["images"] if self.timing["images"] else None
+
+    def items(self):
+        """(key, digest, probs) for every cached image, latest row per key."""
+        for key, (digest, row) in self._index.items():
+            yield key, digest, self._row(row)
+
+    def compact(self):
+        """Rewrites the store without rows that a newer prediction for the same key replaced."""
+        with self._lock:
+            entries = sorted(self._index.items(), key=lambda item: item[1][1])
+            if len(entries) == self._rows:
+                return 0
+            probs = np.stack([self.get(key, digest) for key, (digest, _) in entries]) if entries \
+                else np.empty((0, self.n_classes), dtype=PROBS_DTYPE)
+            self._probs_file.close()
+            self._index_file.close()
+            self._probs = None  # release the memmap before replacing its file
+            index = "".join(json.dumps({"key": key, "digest": digest, "row": row}) + "\n"
+                            for row, (key, (digest, _)) in enumerate(entries))
+            _replace(self._probs_path, probs.tobytes())
+            _replace(self._index_path, index.encode("utf-8"))
+            dropped = self._rows - len(entries)
+            self._index = {}
+            self._load()
+            self._probs_file = open(self._probs_path, "ab")
+            self._index_file = open(self._index_path, "a", encoding="utf-8")
+            return dropped
+
+    def close(self):
+        self._probs_file.close()
+        self._index_file.close()
+        with open(self._timing_path, "w", encoding="utf-8") as f:
+            json.dump(self.timing, f)
@@ -0,0 +1,195 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import streamlit as st
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+PROFILE_MODES = ("sampling", "cprofile")
+TOP_N = 20
+SAMPLE_INTERVAL = 0.005
+
+# tf.profiler traces the whole process, so only one profiler may own it at a time.
+_tf_trace_lock = threading.Lock()
+_tf_trace_owner = None
+
+
+def _function_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler:
+    """Samples one thread's Python stack from a background thread; the target runs unmodified."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.self_time = Counter()
+        self.total_time = Counter()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(thread_id,), name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, thread_id):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_function_label(frame.f_code))
+                frame = frame.f_back
+            self.samples += 1
+            self.self_time[stack[0]] += weight
+            for label in set(stack):
+                self.total_time[label] += weight
+            self.stacks[";".join(reversed(stack))] += 1
+
+
+class Profiler:
+    """
+    Opt-in profile of a live session or a single analysis. `start`/`stop` may be called
+    several times (a paused and resumed session) and accumulate into one profile.
+
+    mode "sampling" reads the stack of the profiled thread every few milliseconds and
+    costs little; "cprofile" counts every call exactly but slows Python-heavy code.
+    With `tf_trace` the TensorFlow profiler also records the model calls, for TensorBoard.
+    """
+
+    def __init__(self, mode="sampling", tf_trace=False, name="profile", interval=SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.tf_trace = tf_trace
+        self.name = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.duration = 0.0
+        self.tf_trace_dir = None
+        self.tf_trace_error = None
+        self._cprofile = cProfile.Profile() if mode == "cprofile" else None
+        self._sampler = _StackSampler(interval) if mode == "sampling" else None
+        self._started = None
+
+    def start(self):
+        if self._started is not None:
+            return
+        self._start_tf_trace()
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        else:
+            self._sampler.start(threading.get_ident())
+
+    def stop(self):
+        if self._started is None:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        else:
+            self._sampler.stop()
+        self.duration += time.perf_counter() - self._started
+        self._started = None
+        self._stop_tf_trace()
+
+    def _start_tf_trace(self):
+        global _tf_trace_owner
+        if not self.tf_trace or "tensorflow" not in sys.modules:
+            return
+        with _tf_trace_lock:
+            if _tf_trace_owner is not None:
+                self.tf_trace_error = "another session is already tracing"
+                return
+            import tensorflow as tf
+            trace_dir = os.path.join(PROFILES_DIR, self.name, "tf_trace")
+            try:
+                tf.profiler.experimental.start(trace_dir)
+            except Exception as e:
+                self.tf_trace_error = str(e)
+                return
+            _tf_trace_owner = self
+            self.tf_trace_dir = trace_dir
+
+    def _stop_tf_trace(self):
+        global _tf_trace_owner
+        with _tf_trace_lock:
+            if _tf_trace_owner is not self:
+                return
+            import tensorflow as tf
+            try:
+                tf.profiler.experimental.stop()
+            except Exception as e:
+                self.tf_trace_error = str(e)
+            _tf_trace_owner = None
+
+    def _top_functions(self, top_n):
+        if self._cprofile is not None:
+            rows = []
+            for (filename, line, name), (_, calls, self_s, total_s, _) in pstats.Stats(self._cprofile).stats.items():
+                rows.append({"Function": f"{name} ({os.path.basename(filename)}:{line})", "Calls": calls,
+                             "Self (ms)": 1000 * self_s, "Total (ms)": 1000 * total_s})
+        else:
+            rows = [{"Function": label, "Calls": None, "Self (ms)": 1000 * self._sampler.self_time[label],
+                     "Total (ms)": 1000 * total_s}
+                    for label, total_s in self._sampler.total_time.items()]
+        rows.sort(key=lambda row: row["Self (ms)"], reverse=True)
+        return rows[:top_n]
+
+    def summary(self, top_n=TOP_N):
+        """Stops the profiler, writes the raw profile under profiles/ and returns a small, picklable summary."""
+        self.stop()
+        os.makedirs(os.path.join(PROFILES_DIR, self.name), exist_ok=True)
+        if self._cprofile is not None:
+            raw_path = os.path.join(PROFILES_DIR, self.name, "profile.prof")
+            self._cprofile.dump_stats(raw_path)  # snakeviz / pstats
+        else:
+            raw_path = os.path.join(PROFILES_DIR, self.name, "stacks.folded")
+            with open(raw_path, "w", encoding="utf-8") as f:  # flamegraph.pl / speedscope
+                f.writelines(f"{stack} {n}\n" for stack, n in self._sampler.stacks.most_common())
+        return {
+            "mode": self.mode,
+            "duration_s": self.duration,
+            "samples": self._sampler.samples if self._sampler is not None else None,
+            "top": self._top_functions(top_n),
+            "raw_path": raw_path,
+            "tf_trace_dir": self.tf_trace_dir,
+            "tf_trace_error": self.tf_trace_error,
+        }
+
+
+def render_profile(profile):
+    """Top-N hot functions of a profile summary, sorted by self time."""
+    import pandas as pd
+
+    detail = f"{profile['mode']} · {profile['duration_s']:.1f}s profiled"
+    if profile["samples"] is not None:
+        detail += f" · {profile['samples']} samples"
+    st.caption(detail)
+    df = pd.DataFrame(profile["top"])
+    if profile["mode"] == "sampling":
+        df = df.drop(columns=["Calls"])
+    st.dataframe(df, use_container_width=True, hide_index=True,
+                 column_config={"Self (ms)": st.column_config.NumberColumn(format="%.1f"),
+                                "Total (ms)": st.column_config.NumberColumn(format="%.1f")})
+    st.caption(f"Raw profile: {profile['raw_path']}")
+    if profile["tf_trace_dir"]:
+        st.caption(f"TensorFlow trace: `tensorboard --logdir {profile['tf_trace_dir']}`")
+    elif profile["tf_trace_error"]:
+        st.caption(f"TensorFlow trace not recorded: {profile['tf_trace_error']}")
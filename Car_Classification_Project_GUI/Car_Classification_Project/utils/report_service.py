@@ -0,0 +1,99 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.metrics import timed
+
+REPORT_WORKERS = 2
+MAX_KEPT_REPORTS = 32
+# Finished reports are copied into the session that shows them, so the shared job
+# table can forget them without another user's download disappearing. A report
+# dropped from both reads as "missing"; the page's generate button builds it again.
+SESSION_KEPT_REPORTS = 8
+
+logger = logging.getLogger(__name__)
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+@st.cache_resource
+def _get_report_pool():
+    return ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+
+
+def submit_report(job_id, builder, *args):
+    """
+    Queues `builder(*args)` on the shared report pool and returns immediately.
+    Builders return `(pdf_bytes, file_name)`, like the generate_*_report functions.
+    Submitting an id that is already queued or finished is a no-op.
+    """
+    with _jobs_lock:
+        if job_id not in _jobs:
+            _jobs[job_id] = _get_report_pool().submit(timed("report", builder=builder.__name__)(builder), *args)
+            _forget_old_reports()
+    return job_id
+
+
+def _forget_old_reports():
+    finished = [job_id for job_id, future in _jobs.items() if future.done()]
+    for job_id in finished[:max(0, len(_jobs) - MAX_KEPT_REPORTS)]:
+        del _jobs[job_id]
+
+
+def get_report(job_id):
+    """Returns `(status, pdf_bytes, file_name)` where status is missing, pending, done or failed."""
+    kept = st.session_state.setdefault("finished_reports", OrderedDict())
+    if job_id in kept:
+        return ("done",) + kept[job_id]
+    with _jobs_lock:
+        future = _jobs.get(job_id)
+    if future is None:
+        return "missing", None, None
+    if not future.done():
+        return "pending", None, None
+    try:
+        pdf_bytes, file_name = future.result()
+    except Exception:
+        logger.exception("Report %s failed", job_id)
+        return "failed", None, None
+    if not pdf_bytes:
+        logger.error("Report %s came back empty", job_id)
+        return "failed", None, None
+    kept[job_id] = (pdf_bytes, file_name)
+    while len(kept) > SESSION_KEPT_REPORTS:
+        kept.popitem(last=False)
+    return "done", pdf_bytes, file_name
+
+
+def render_report_status(job_id, key, poll_interval=0.5):
+    """
+    Shows a download button once the report is ready, polling in a fragment meanwhile so
+    only this widget reruns. Returns True the first time the finished report is shown.
+    """
+    status, pdf_bytes, file_name = get_report(job_id)
+
+    if status == "pending":
+        @st.fragment(run_every=poll_interval)
+        def _wait_for_report():
+            if get_report(job_id)[0] != "pending":
+                st.rerun()
+            st.markdown(
+                '<div style="text-align:center; color:#00CCFF; font-size:0.9rem;">Building PDF report...</div>',
+                unsafe_allow_html=True)
+
+        _wait_for_report()
+    elif status == "done":
+        st.download_button("Download PDF", pdf_bytes, file_name, "application/pdf", key=key,
+                           use_container_width=True)
+    elif status == "failed":
+        st.error("Report generation failed.")
+
+    announced = st.session_state.setdefault("announced_reports", set())
+    if status == "done" and job_id not in announced:
+        announced.add(job_id)
+        return True
+    return False
@@ -0,0 +1,324 @@
+import io
+import os
+from datetime import datetime
+
+from PIL import Image
+
+from utils.charts import render_bar_chart
+from utils.class_names import CAR_CLASSES
+
+
+def render_probability_chart(result_data):
+    top_3 = result_data['top_3_indices']
+    labels = tuple(CAR_CLASSES[i] for i in top_3)
+    values = tuple(float(result_data['preds'][0][i]) for i in top_3)
+    return render_bar_chart(labels, values, horizontal=True, value_format="{:.1%}", width_px=1200, height_px=600,
+                            dpi=200, gradient=True)
+
+
+def generate_analysis_report(result_data, img_bytes, cam_bytes=None, chart_bytes=None):
+    # ReportLab is only imported once a report is actually built.
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+
+    try:
+        if chart_bytes is None:
+            chart_bytes = render_probability_chart(result_data)
+
+        buffer = io.BytesIO()
+        PAGE_W, PAGE_H = A4
+        MARGIN_X = 0.6 * inch
+
+        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1.5 * inch, bottomMargin=1.1 * inch, leftMargin=MARGIN_X,
+                                rightMargin=MARGIN_X)
+
+        COLOR_BG = colors.HexColor('#020c1a')
+        COLOR_PANEL = colors.HexColor('#0b1d36')
+        COLOR_NEON = colors.HexColor('#00CCFF')
+        COLOR_TEXT = colors.white
+        COLOR_DIM = colors.HexColor('#8899A6')
+
+        def header_footer_gen(canvas, doc):
+            canvas.saveState()
+            canvas.setFillColor(COLOR_BG)
+            canvas.rect(0, 0, PAGE_W, PAGE_H, fill=1, stroke=0)
+
+            main_title = "Intelligent Analysis Report"
+            sub_title = "Car Classification"
+
+            canvas.setFont("Helvetica-Bold", 24)
+            canvas.setFillColor(COLOR_TEXT)
+            canvas.drawString(MARGIN_X, PAGE_H - 55, main_title)
+
+            canvas.setFont("Helvetica-Bold", 18)
+            canvas.setFillColor(COLOR_NEON)
+            canvas.drawString(MARGIN_X + canvas.stringWidth(main_title, "Helvetica-Bold", 24), PAGE_H - 55, sub_title)
+
+            canvas.setStrokeColor(COLOR_NEON)
+            canvas.setLineWidth(0.8)
+            canvas.line(MARGIN_X, PAGE_H - 70, PAGE_W - MARGIN_X, PAGE_H - 70)
+
+            canvas.setFont("Helvetica", 8)
+            canvas.setFillColor(COLOR_DIM)
+            canvas.drawString(MARGIN_X, 40, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+            canvas.drawRightString(PAGE_W - MARGIN_X, 40, f"Page {doc.page}")
+
+            canvas.restoreState()
+
+        styles = getSampleStyleSheet()
+        style_h1 = ParagraphStyle('H1', parent=styles['Heading1'], fontName='Helvetica-Bold', fontSize=16,
+                                  textColor=COLOR_NEON, spaceBefore=20, spaceAfter=12)
+        style_normal = ParagraphStyle('Normal_W', parent=styles['Normal'], textColor=colors.white)
+
+        story = [Spacer(1, 0.25 * inch)]
+
+        story.append(Paragraph("01 // SUMMARY RESULTS", style_h1))
+        data = [
+            ["Model Architecture", result_data['model_name']],
+            ["Detected Class", result_data['top_class']],
+            ["Confidence Score", f"{result_data['confidence'] * 100:.2f}%"]
+        ]
+
+        col_w = (PAGE_W - 2 * MARGIN_X) / 2
+        t = Table(data, colWidths=[col_w * 0.6, col_w * 1.4])
+        t.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), COLOR_PANEL),
+            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#051426')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('GRID', (0, 0), (-1, -1), 0.5, COLOR_DIM),
+            ('BOX', (0, 0), (-1, -1), 1, COLOR_NEON),
+            ('PADDING', (0, 0), (-1, -1), 8),
+        ]))
+        story.append(t)
+        story.append(Spacer(1, 20))
+
+        story.append(Paragraph("02 // VISUAL EVIDENCE", style_h1))
+        img_table_data = []
+        row = []
+        if img_bytes:
+            img1 = RLImage(io.BytesIO(img_bytes), width=3.3 * inch, height=2.5 * inch)
+            row.append([img1, Paragraph("Original Input", style_normal)])
+        if cam_bytes:
+            img2 = RLImage(io.BytesIO(cam_bytes), width=3.3 * inch, height=2.5 * inch)
+            row.append([img2, Paragraph("Grad-CAM Heatmap", style_normal)])
+
+        final_img_data = [[item[0] for item in row], [item[1] for item in row]] if row else []
+        if final_img_data:
+            t_imgs = Table(final_img_data, colWidths=[3.5 * inch] * len(row))
+            t_imgs.setStyle(TableStyle([
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+            ]))
+            story.append(t_imgs)
+
+        story.append(Spacer(1, 20))
+
+        if chart_bytes:
+            story.append(Paragraph("03 // PROBABILITY DISTRIBUTION", style_h1))
+            chart_img = RLImage(io.BytesIO(chart_bytes), width=PAGE_W - 2 * MARGIN_X, height=3 * inch)
+            story.append(chart_img)
+
+        doc.build(story, onFirstPage=header_footer_gen, onLaterPages=header_footer_gen)
+        return buffer.getvalue(), f"Analysis_Report_{datetime.now().strftime('%H%M%S')}.pdf"
+    except Exception as e:
+        print(f"Report Error: {e}")
+        return None, None
+
+
+def generate_session_report(session_data):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+
+    try:
+        buffer = io.BytesIO()
+        PAGE_W, PAGE_H = A4
+        MARGIN_X = 0.6 * inch
+        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1.5 * inch, bottomMargin=1.1 * inch, leftMargin=MARGIN_X,
+                                rightMargin=MARGIN_X)
+        COLOR_BG = colors.HexColor('#020c1a')
+        COLOR_PANEL = colors.HexColor('#0b1d36')
+        COLOR_NEON = colors.HexColor('#00CCFF')
+        COLOR_TEAL = colors.HexColor('#0A9396')
+        COLOR_TEXT = colors.white
+        COLOR_DIM = colors.HexColor('#8899A6')
+
+        def header_footer_gen(canvas, doc):
+            canvas.saveState()
+            canvas.setFillColor(COLOR_BG)
+            canvas.rect(0, 0, PAGE_W, PAGE_H, fill=1, stroke=0)
+            main_title = "CarAI Report "
+            sub_title = "Live Inspector"
+            canvas.setFont("Helvetica-Bold", 24)
+            canvas.setFillColor(COLOR_TEXT)
+            canvas.drawString(MARGIN_X, PAGE_H - 55, main_title)
+            canvas.setFont("Helvetica-Bold", 18)
+            canvas.setFillColor(COLOR_NEON)
+            canvas.drawString(MARGIN_X + canvas.stringWidth(main_title, "Helvetica-Bold", 24), PAGE_H - 55, sub_title)
+            canvas.setStrokeColor(COLOR_NEON)
+            canvas.setLineWidth(0.8)
+            canvas.line(MARGIN_X, PAGE_H - 70, PAGE_W - MARGIN_X, PAGE_H - 70)
+            canvas.setFont("Helvetica", 7)
+            canvas.setFillColor(COLOR_DIM)
+            canvas.drawString(MARGIN_X, 40, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+            canvas.drawRightString(PAGE_W - MARGIN_X, 40, f"Page {doc.page}")
+            canvas.restoreState()
+
+        styles = getSampleStyleSheet()
+        style_h1 = ParagraphStyle('H1', parent=styles['Heading1'], fontName='Helvetica-Bold', fontSize=15,
+                                  textColor=COLOR_NEON, spaceBefore=20, spaceAfter=12)
+        story = [Spacer(1, 0.25 * inch), Paragraph("01 // SESSION METRICS", style_h1)]
+        df = session_data['df']
+
+        frames_count = session_data.get('frames_count', 0)
+        duration = session_data.get('duration', 1)
+        fps_avg = frames_count / duration if duration > 0 else 0
+        detections_count = len(df) if df is not None and not df.empty else 0
+
+        col_w = (PAGE_W - 2 * MARGIN_X) / 3
+        kpi_data = [["DURATION", "AVG FPS", "MODELS DETECTED"],
+                    [f"{duration:.1f}s", f"{fps_avg:.1f}", str(detections_count)]]
+        t_metrics = Table(kpi_data, colWidths=[col_w] * 3)
+        t_metrics.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), COLOR_PANEL),
+            ('TEXTCOLOR', (0, 0), (-1, 0), COLOR_DIM), ('TEXTCOLOR', (0, 1), (-1, 1), COLOR_NEON),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'), ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 1), (-1, 1), 16), ('BOTTOMPADDING', (0, 1), (-1, 1), 12),
+            ('BOX', (0, 0), (-1, -1), 0.4, COLOR_TEAL)
+        ]))
+        story.append(t_metrics)
+        story.append(Spacer(1, 22))
+
+        if session_data.get('best_detection'):
+            story.append(Paragraph("02 // HIGHEST CONFIDENCE DETECTION", style_h1))
+            bd = session_data['best_detection']
+            if os.path.exists(bd['path']):
+                img = RLImage(bd['path'], width=5 * inch, height=3.75 * inch)
+                story.append(img)
+                story.append(Spacer(1, 10))
+
+                info_data = [[f"MODEL: {bd['class']}", f"CONFIDENCE: {bd['conf']:.2%}", f"TIME: {bd['time']}"]]
+                t_info = Table(info_data, colWidths=[2 * inch, 2 * inch, 2 * inch])
+                t_info.setStyle(TableStyle([
+                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                    ('BACKGROUND', (0, 0), (-1, -1), COLOR_PANEL),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('BOX', (0, 0), (-1, -1), 1, colors.gold)
+                ]))
+                story.append(t_info)
+            story.append(Spacer(1, 25))
+
+        if df is not None and not df.empty:
+            story.append(PageBreak())
+            story.append(Paragraph("03 // ANALYTICS", style_h1))
+            counts = df['Car_Model'].value_counts()
+            chart_bytes = render_bar_chart(tuple(counts.index), tuple(int(c) for c in counts.values))
+            story.append(
+                RLImage(io.BytesIO(chart_bytes), width=PAGE_W - 2 * MARGIN_X, height=3.3 * inch))
+
+        doc.build(story, onFirstPage=header_footer_gen, onLaterPages=header_footer_gen)
+        return buffer.getvalue(), f"CarAI_Report_{datetime.now().strftime('%H%M')}.pdf"
+    except Exception as e:
+        print(f"PDF Error: {e}")
+        return None, None
+
+
+def generate_comparison_report(image_bytes, results):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+
+    try:
+        buffer = io.BytesIO()
+        PAGE_W, PAGE_H = A4
+        MARGIN_X = 0.6 * inch
+        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1.5 * inch, bottomMargin=1.1 * inch, leftMargin=MARGIN_X,
+                                rightMargin=MARGIN_X)
+
+        COLOR_BG = colors.HexColor('#020c1a')
+        COLOR_PANEL = colors.HexColor('#0b1d36')
+        COLOR_NEON = colors.HexColor('#00CCFF')
+        COLOR_TEXT = colors.white
+        COLOR_DIM = colors.HexColor('#8899A6')
+
+        def header_footer_gen(canvas, doc):
+            canvas.saveState()
+            canvas.setFillColor(COLOR_BG)
+            canvas.rect(0, 0, PAGE_W, PAGE_H, fill=1, stroke=0)
+
+            main_title = "CarAI Benchmark"
+            sub_title = "Model Comparison"
+
+            canvas.setFont("Helvetica-Bold", 24)
+            canvas.setFillColor(COLOR_TEXT)
+            canvas.drawString(MARGIN_X, PAGE_H - 55, main_title)
+
+            canvas.setFont("Helvetica-Bold", 18)
+            canvas.setFillColor(COLOR_NEON)
+            canvas.drawString(MARGIN_X + canvas.stringWidth(main_title, "Helvetica-Bold", 24), PAGE_H - 55, sub_title)
+
+            canvas.setStrokeColor(COLOR_NEON)
+            canvas.setLineWidth(0.8)
+            canvas.line(MARGIN_X, PAGE_H - 70, PAGE_W - MARGIN_X, PAGE_H - 70)
+
+            canvas.restoreState()
+
+        styles = getSampleStyleSheet()
+        style_h1 = ParagraphStyle('H1', parent=styles['Heading1'], fontName='Helvetica-Bold', fontSize=15,
+                                  textColor=COLOR_NEON, spaceBefore=20, spaceAfter=12)
+
+        story = [Spacer(1, 0.25 * inch)]
+
+        story.append(Paragraph("01 // INPUT IMAGE", style_h1))
+        if image_bytes:
+            img_io = io.BytesIO(image_bytes)
+            pil_img = Image.open(img_io).convert("RGB")
+            orig_w, orig_h = pil_img.size
+            aspect = orig_h / float(orig_w)
+            target_w = 5 * inch
+            target_h = target_w * aspect
+            if target_h > 3 * inch:
+                target_h = 3 * inch
+                target_w = target_h / aspect
+
+            rl_img = RLImage(img_io, width=target_w, height=target_h)
+            story.append(rl_img)
+            story.append(Spacer(1, 20))
+
+        story.append(Paragraph("02 // BENCHMARK RESULTS", style_h1))
+
+        data = [["MODEL ARCHITECTURE", "PREDICTED CLASS", "CONFIDENCE"]]
+        for res in results:
+            data.append([res['Model'], res['Class'], f"{res['Conf']:.2%}"])
+
+        col_w = (PAGE_W - 2 * MARGIN_X) / 3
+        t = Table(data, colWidths=[col_w] * 3)
+        t.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), COLOR_PANEL),
+            ('TEXTCOLOR', (0, 0), (-1, 0), COLOR_NEON),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.Color(1, 1, 1, 0.05)),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+        ]))
+        story.append(t)
+
+        doc.build(story, onFirstPage=header_footer_gen, onLaterPages=header_footer_gen)
+        return buffer.getvalue(), f"Benchmark_Report_{datetime.now().strftime('%H%M')}.pdf"
+    except Exception as e:
+        print(e)
+        return None, None
@@ -0,0 +1,129 @@
+import os
+
+import tensorflow as tf
+
+from utils.image_sources import is_image_name
+from utils.model_helper import get_input_size, get_keras_preprocessor
+
+SPLITS = ("train", "val", "test")
+
+# The training notebooks' ImageDataGenerator settings (rotation in degrees, zoom and
+# shift as fractions); only the EfficientNetB4 notebook also shifts.
+AUGMENTATION = {
+    "EfficientNetB4": {"rotation": 15, "zoom": 0.1, "shift": 0.1, "flip": True},
+    "InceptionV3": {"rotation": 15, "zoom": 0.1, "shift": 0.0, "flip": True},
+    "ResNet50": {"rotation": 15, "zoom": 0.1, "shift": 0.0, "flip": True},
+}
+DEFAULT_AUGMENTATION = AUGMENTATION["EfficientNetB4"]
+SHUFFLE_BUFFER = 2048
+
+
+def list_splits(data_dir):
+    """
+    Lists `(relative_path, label)` per split the way the notebooks' generators do:
+    train/ as is, test/ halved per class into validation (first half) and test.
+    """
+    class_names = sorted(d for d in os.listdir(os.path.join(data_dir, "train"))
+                         if os.path.isdir(os.path.join(data_dir, "train", d)))
+    splits = {split: [] for split in SPLITS}
+    for label, name in enumerate(class_names):
+        for folder in ("train", "test"):
+            class_dir = os.path.join(data_dir, folder, name)
+            files = sorted(f for f in os.listdir(class_dir) if is_image_name(f)) if os.path.isdir(class_dir) else []
+            entries = [(f"{folder}/{name}/{f}", label) for f in files]
+            if folder == "train":
+                splits["train"] += entries
+            else:
+                n_val = int(0.5 * len(entries))
+                splits["val"] += entries[:n_val]
+                splits["test"] += entries[n_val:]
+    return class_names, splits
+
+
+def make_augmenter(rotation=15, zoom=0.1, shift=0.1, flip=True):
+    """Keras preprocessing layers equivalent to the notebooks' ImageDataGenerator, applied to whole batches."""
+    # ImageDataGenerator fills the uncovered border with the nearest pixel.
+    layers = []
+    if rotation:
+        layers.append(tf.keras.layers.RandomRotation(rotation / 360, fill_mode="nearest"))
+    if zoom:
+        layers.append(tf.keras.layers.RandomZoom(zoom, fill_mode="nearest"))
+    if shift:
+        layers.append(tf.keras.layers.RandomTranslation(shift, shift, fill_mode="nearest"))
+    if flip:
+        layers.append(tf.keras.layers.RandomFlip("horizontal"))
+    return tf.keras.Sequential(layers, name="augment")
+
+
+def build_dataset(paths, targets, input_size, batch_size, training, model_name=None, augmentation=None,
+                  cache=None, resize_method="nearest", shuffle_buffer=SHUFFLE_BUFFER, seed=None):
+    """
+    `(images, targets)` batches from image files, decoded and resized on all cores.
+
+    Images are decoded and resized once to `input_size` as uint8. With `cache` set
+    (a file prefix, or "" for memory) they are kept after the first epoch, so later
+    epochs skip the JPEG decode and the resize; at 384x384 the Stanford Cars train
+    split takes about 3.6 GB, so prefer a file for the larger resolutions.
+    Augmentation runs on whole batches; `model_name` selects the `preprocess_input`
+    normalisation (none for models that normalise inside the graph).
+    Nearest-neighbour resize matches the generators the models were trained with.
+    """
+    width, height = input_size
+    paths = list(paths)
+
+    def load(path, target):
+        image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        image = tf.image.resize(image, (height, width), method=resize_method)
+        if image.dtype != tf.uint8:
+            image = tf.saturate_cast(tf.round(image), tf.uint8)
+        image.set_shape((height, width, 3))
+        return image, target
+
+    ds = tf.data.Dataset.from_tensor_slices((paths, targets))
+    if training and cache is None:
+        # Shuffling file names is free; decoded images would all have to sit in the buffer.
+        ds = ds.shuffle(len(paths), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+    if cache is not None:
+        ds = ds.cache(cache)
+        if training:
+            ds = ds.shuffle(min(shuffle_buffer, len(paths)), seed=seed, reshuffle_each_iteration=True)
+    return batch_pipeline(ds, batch_size, training, model_name, augmentation)
+
+
+def batch_pipeline(ds, batch_size, training, model_name=None, augmentation=None):
+    """Batches `(uint8 image, target)` pairs, then augments (training only), normalises and prefetches."""
+    ds = ds.batch(batch_size)
+    ds = ds.map(lambda x, y: (tf.cast(x, tf.float32), y), num_parallel_calls=tf.data.AUTOTUNE)
+
+    if training and augmentation:
+        augmenter = make_augmenter(**augmentation)
+        ds = ds.map(lambda x, y: (augmenter(x, training=True), y), num_parallel_calls=tf.data.AUTOTUNE)
+    if model_name is not None:
+        preprocess = get_keras_preprocessor(model_name)
+        ds = ds.map(lambda x, y: (preprocess(x), y), num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def cache_prefix(cache_dir, split, input_size, resize_method="nearest"):
+    """One cache per split and resolution, shared by every architecture with that input size."""
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{split}_{input_size[0]}x{input_size[1]}_{resize_method}")
+
+
+def folder_dataset(data_dir, split, model_name, batch_size=16, cache_dir=None, splits=None, seed=None):
+    """
+    A split of the Stanford Cars folder layout, ready for `model.fit` with the
+    notebooks' one-hot labels, input size, augmentation (train only) and normalisation.
+    Returns `(dataset, class_names, entries)`.
+    """
+    class_names, all_splits = splits or list_splits(data_dir)
+    entries = all_splits[split]
+    input_size = get_input_size(model_name)
+    training = split == "train"
+    labels = tf.one_hot([label for _, label in entries], len(class_names))
+    ds = build_dataset([os.path.join(data_dir, rel_path) for rel_path, _ in entries], labels, input_size,
+                       batch_size, training, model_name=model_name,
+                       augmentation=AUGMENTATION.get(model_name, DEFAULT_AUGMENTATION) if training else None,
+                       cache=cache_prefix(cache_dir, split, input_size) if cache_dir else None, seed=seed)
+    return ds, class_names, entries
@@ -0,0 +1,247 @@
+import multiprocessing as mp
+import os
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.class_names import CAR_CLASSES
+from utils.model_helper import MODEL_FILES, MODELS_DIR, ORT_OPTIMIZATION_LEVEL, onnx_path_for, get_input_size, \
+    load_custom_model, OnnxModel
+
+SHARED_ALIGNMENT = 64
+WORKER_START_TIMEOUT = 600
+
+
+def _attach(name):
+    """Opens a block created by the parent without letting this process unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _share_onnx_initializers(onnx_path):
+    """
+    Copies every initializer of the ONNX model into one shared memory block.
+    Returns the block and its layout as (name, dtype, shape, offset) tuples.
+    """
+    import onnx
+    from onnx import numpy_helper
+
+    arrays = [(init.name, numpy_helper.to_array(init)) for init in onnx.load(onnx_path).graph.initializer]
+    layout, offset = [], 0
+    for name, array in arrays:
+        offset += -offset % SHARED_ALIGNMENT
+        layout.append((name, array.dtype.str, array.shape, offset))
+        offset += array.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (_, dtype, shape, start), (_, array) in zip(layout, arrays):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = array
+    return shm, layout
+
+
+def _load_worker_model(spec, threads):
+    if spec["weights_shm"] is not None:
+        weights = _attach(spec["weights_shm"])
+        initializers = {name: np.ndarray(shape, dtype=dtype, buffer=weights.buf, offset=start)
+                        for name, dtype, shape, start in spec["weights_layout"]}
+        model = OnnxModel(spec["onnx_path"], threads, spec["opt_level"], initializers=initializers)
+        model._weights_shm = weights  # the session reads from it for as long as it lives
+        return model
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    model = load_custom_model(spec["model_path"], backend="keras")
+    if model is None:
+        raise RuntimeError(f"could not load {spec['model_path']}")
+    return model
+
+
+def _worker_main(spec, threads, tasks, done):
+    try:
+        model = _load_worker_model(spec, threads)
+        inputs_shm, outputs_shm = _attach(spec["inputs_shm"]), _attach(spec["outputs_shm"])
+        inputs = np.ndarray(spec["inputs_shape"], dtype=np.float32, buffer=inputs_shm.buf)
+        outputs = np.ndarray(spec["outputs_shape"], dtype=np.float32, buffer=outputs_shm.buf)
+    except Exception as e:
+        done.put(("ready", None, f"{type(e).__name__}: {e}"))
+        return
+    done.put(("ready", None, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        slot, n = task
+        try:
+            outputs[slot, :n] = np.asarray(model.predict_on_batch(inputs[slot, :n]))
+            done.put(("result", slot, None))
+        except Exception as e:
+            done.put(("result", slot, f"{type(e).__name__}: {e}"))
+
+
+class InferenceWorkerPool:
+    """
+    Runs one model in several worker processes to use all cores.
+
+    With an ONNX export (tools.export_onnx) and the `onnx` package installed, the
+    weights are loaded once into shared memory and every worker's ONNX Runtime
+    session reads them in place, so adding workers adds little RAM. Otherwise each
+    worker loads its own Keras copy.
+
+    Batches travel through a shared memory ring of `slots` input/output buffers;
+    only slot numbers go through the queues, nothing is pickled.
+
+        with InferenceWorkerPool("EfficientNetB4", workers=4) as pool:
+            ticket = pool.submit(preprocess_batch(images, "EfficientNetB4"))
+            probs = pool.result(ticket)
+    """
+
+    def __init__(self, model_name, workers=2, batch_size=16, slots=None, threads_per_worker=None,
+                 model_path=None):
+        self.model_name = model_name
+        self.workers = workers
+        self.batch_size = batch_size
+        self.slots = slots or 2 * workers
+        model_path = model_path or os.path.join(MODELS_DIR, MODEL_FILES[model_name])
+        threads = threads_per_worker or max(1, (os.cpu_count() or workers) // workers)
+        width, height = get_input_size(model_name)
+
+        self._shms = []
+        self._weights_shm, layout = self._share_weights(model_path)
+        self.shared_weights = self._weights_shm is not None
+        inputs_shape = (self.slots, batch_size, height, width, 3)
+        outputs_shape = (self.slots, batch_size, len(CAR_CLASSES))
+        inputs_shm = self._create(int(np.prod(inputs_shape)) * 4)
+        outputs_shm = self._create(int(np.prod(outputs_shape)) * 4)
+        self._inputs = np.ndarray(inputs_shape, dtype=np.float32, buffer=inputs_shm.buf)
+        self._outputs = np.ndarray(outputs_shape, dtype=np.float32, buffer=outputs_shm.buf)
+
+        spec = {
+            "model_path": model_path,
+            "onnx_path": onnx_path_for(model_path),
+            "opt_level": ORT_OPTIMIZATION_LEVEL,
+            "weights_shm": self._weights_shm.name if self.shared_weights else None,
+            "weights_layout": layout,
+            "inputs_shm": inputs_shm.name,
+            "outputs_shm": outputs_shm.name,
+            "inputs_shape": inputs_shape,
+            "outputs_shape": outputs_shape,
+        }
+        # TensorFlow and ONNX Runtime are not fork-safe, so workers always start fresh.
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._done = ctx.Queue()
+        self._processes = [ctx.Process(target=_worker_main, args=(spec, threads, self._tasks, self._done),
+                                       name=f"inference-{i}", daemon=True) for i in range(workers)]
+        self._free = list(range(self.slots))
+        self._pending = {}
+        self._finished = {}
+        self._next_ticket = 0
+        try:
+            for process in self._processes:
+                process.start()
+            self._wait_ready()
+        except Exception:
+            self.close()
+            raise
+
+    def _create(self, size):
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._shms.append(shm)
+        return shm
+
+    def _share_weights(self, model_path):
+        onnx_path = onnx_path_for(model_path)
+        if not os.path.exists(onnx_path):
+            print(f"No ONNX export at {onnx_path}: every worker loads its own Keras copy of the weights.")
+            return None, None
+        try:
+            import onnxruntime  # noqa: F401
+            shm, layout = _share_onnx_initializers(onnx_path)
+        except ImportError as e:
+            print(f"Shared weights need onnx and onnxruntime ({e}): every worker loads its own Keras copy.")
+            return None, None
+        self._shms.append(shm)
+        return shm, layout
+
+    def _wait_ready(self):
+        for _ in self._processes:
+            _, _, error = self._get_message(WORKER_START_TIMEOUT)
+            if error is not None:
+                raise RuntimeError(f"Inference worker failed to start: {error}")
+
+    def _get_message(self, timeout=None):
+        while True:
+            try:
+                return self._done.get(timeout=5 if timeout is None else min(timeout, 5))
+            except queue.Empty:
+                if not all(process.is_alive() for process in self._processes):
+                    raise RuntimeError("An inference worker exited unexpectedly")
+                if timeout is not None:
+                    timeout -= 5
+                    if timeout <= 0:
+                        raise TimeoutError("Inference workers did not respond")
+
+    def _receive(self):
+        _, slot, error = self._get_message()
+        ticket, n = self._pending.pop(slot)
+        self._finished[ticket] = (slot, n, error)
+
+    def submit(self, batch):
+        """Copies a preprocessed batch into a free slot and queues it; returns a ticket for `result`."""
+        batch = np.asarray(batch, dtype=np.float32)
+        if len(batch) > self.batch_size:
+            raise ValueError(f"Batch of {len(batch)} exceeds the pool's batch size {self.batch_size}")
+        while not self._free:
+            if not self._pending:
+                raise RuntimeError("All slots hold results that were never collected with result()")
+            self._receive()
+        slot = self._free.pop()
+        self._inputs[slot, :len(batch)] = batch
+        ticket, self._next_ticket = self._next_ticket, self._next_ticket + 1
+        self._pending[slot] = (ticket, len(batch))
+        self._tasks.put((slot, len(batch)))
+        return ticket
+
+    def result(self, ticket):
+        """Blocks until the batch behind `ticket` is done and returns its probabilities."""
+        while ticket not in self._finished:
+            self._receive()
+        slot, n, error = self._finished.pop(ticket)
+        probs = self._outputs[slot, :n].copy()
+        self._free.append(slot)
+        if error is not None:
+            raise RuntimeError(f"Inference failed in a worker: {error}")
+        return probs
+
+    def predict_on_batch(self, batch):
+        return self.result(self.submit(batch))
+
+    def close(self):
+        for process in self._processes:
+            if process.is_alive():
+                self._tasks.put(None)
+        for process in self._processes:
+            if process.pid is not None:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+        # The array views must go before the blocks they point into can be closed.
+        self._inputs = self._outputs = None
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()